@@ -1,4 +1,4 @@
-from flask import Flask
+from flask import Flask, jsonify
 from flask_migrate import Migrate
 from config import Config
 from db import db
@@ -36,9 +36,20 @@ def create_app():
     app.register_blueprint(profile_bp, url_prefix='/profile')
     app.register_blueprint(settings_bp, url_prefix='/settings')
 
+    @app.before_request
+    def start_core_service():
+        core_service.start()
+
+    @app.route('/ready')
+    def ready():
+        readiness = core_service.readiness()
+
+        return jsonify(readiness), 200 if readiness["ready"] else 503
+
     return app
 
 
 if __name__ == '__main__':
     app = create_app()
+    core_service.start()
     app.run(debug=True)
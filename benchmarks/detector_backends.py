@@ -0,0 +1,101 @@
+import argparse
+import glob
+import os
+import time
+
+import cv2
+import numpy
+
+from control.analysis.backend import DetectorBackend, BACKEND_FORMATS
+
+
+def load_frames(source=None, count=20, shape=(720, 1280, 3)):
+    if source is None:
+        generator = numpy.random.default_rng(0)
+        return [generator.integers(0, 255, shape, dtype=numpy.uint8) for _ in range(count)]
+
+    paths = sorted(glob.glob(os.path.join(source, "*.jpg")) + glob.glob(os.path.join(source, "*.png")))[:count]
+
+    return [cv2.imread(path) for path in paths]
+
+
+def measure_latency(detector, frames, warmup=3):
+    for frame in frames[:warmup]:
+        detector.detect(frame)
+
+    latencies = []
+    for frame in frames:
+        start = time.perf_counter()
+        detector.detect(frame)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    return numpy.median(latencies), numpy.percentile(latencies, 95)
+
+
+def measure_throughput(detector, frames, batch_size):
+    detector.batch_size = batch_size
+    detector.detect_batch(frames[:batch_size])
+
+    start = time.perf_counter()
+    for index in range(0, len(frames) - batch_size + 1, batch_size):
+        detector.detect_batch(frames[index:index + batch_size])
+    elapsed = time.perf_counter() - start
+
+    return (len(frames) // batch_size) * batch_size / elapsed
+
+
+def run_batching(model_path, batch_sizes, input_size=640, source=None, count=32):
+    frames = load_frames(source, count)
+    detector = DetectorBackend(model_path, "torch", input_size)
+
+    print(f"{'batch':>6} {'frames/s':>10}")
+    for batch_size in batch_sizes:
+        print(f"{batch_size:>6} {measure_throughput(detector, frames, batch_size):>10.1f}")
+
+
+def measure_accuracy(detector, data):
+    metrics = detector.model.val(
+        data=data,
+        imgsz=max(detector.input_size),
+        batch=1,
+        device="cpu",
+        plots=False,
+        verbose=False
+    )
+
+    return metrics.box.map50, metrics.box.map
+
+
+def run(model_path, backends, input_sizes=(640,), source=None, data=None, count=20):
+    frames = load_frames(source, count)
+
+    print(f"{'backend':<10} {'size':>6} {'median ms':>10} {'p95 ms':>10} {'mAP50':>8} {'mAP50-95':>9}")
+    for backend in backends:
+        for input_size in input_sizes:
+            try:
+                detector = DetectorBackend(model_path, backend, input_size)
+            except Exception as e:
+                print(f"{backend:<10} {input_size:>6} unavailable: {e}")
+                continue
+
+            median, p95 = measure_latency(detector, frames)
+            map50, map50_95 = measure_accuracy(detector, data) if data else (float("nan"), float("nan"))
+
+            print(f"{backend:<10} {input_size:>6} {median:>10.1f} {p95:>10.1f} {map50:>8.3f} {map50_95:>9.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="control/analysis/yolov8n-visdrone.pt")
+    parser.add_argument("--backends", nargs="+", default=list(BACKEND_FORMATS.keys()))
+    parser.add_argument("--input-sizes", type=int, nargs="+", default=[320, 480, 640, 800, 960, 1280])
+    parser.add_argument("--frames", help="directory of sample frames, random frames are used when omitted")
+    parser.add_argument("--data", help="dataset yaml used for mAP, e.g. VisDrone.yaml")
+    parser.add_argument("--count", type=int, default=20)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", help="measure torch throughput per batch size instead")
+    args = parser.parse_args()
+
+    if args.batch_sizes:
+        run_batching(args.model, args.batch_sizes, args.input_sizes[0], args.frames, max(args.count, max(args.batch_sizes)))
+    else:
+        run(args.model, args.backends, args.input_sizes, args.frames, args.data, args.count)
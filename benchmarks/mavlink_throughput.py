@@ -0,0 +1,99 @@
+import statistics
+import threading
+import time
+
+from pymavlink import mavutil
+
+from control.communication.mavlink.mavlink import MAVLinkController, DataAcquisitionThread
+from control.communication.mavlink.mavlink.processor import AttitudeProcessor, GimbalProcessor
+
+
+class CountingAttitudeProcessor(AttitudeProcessor):
+    def __init__(self):
+        super().__init__()
+        self.count = 0
+
+    def add_data(self, data):
+        super().add_data(data)
+        self.count += 1
+
+
+class ReplayedAutopilot:
+    def __init__(self, address):
+        self.connection = mavutil.mavlink_connection(address, source_system=1, source_component=1)
+        self.running = True
+        self.sent = 0
+        self.command_received = threading.Event()
+
+        self.sender = threading.Thread(target=self.stream, daemon=True)
+        self.listener = threading.Thread(target=self.listen, daemon=True)
+
+    def start(self):
+        self.sender.start()
+        self.listener.start()
+
+    def stream(self):
+        mav = self.connection.mav
+        while self.running:
+            if self.sent % 1000 == 0:
+                mav.heartbeat_send(
+                    mavutil.mavlink.MAV_TYPE_QUADROTOR,
+                    mavutil.mavlink.MAV_AUTOPILOT_ARDUPILOTMEGA,
+                    0, 0, 0
+                )
+
+            mav.attitude_send(int(time.time() * 1000) & 0xFFFFFFFF, 0.1, 0.2, 0.3, 0.01, 0.02, 0.03)
+            mav.vfr_hud_send(10.0, 10.0, 90, 50, 100.0, 0.0)
+            self.sent += 2
+
+    def listen(self):
+        while self.running:
+            message = self.connection.recv_match(type="COMMAND_LONG", blocking=True, timeout=0.5)
+            if message is not None:
+                self.command_received.set()
+
+    def stop(self):
+        self.running = False
+
+
+def run(duration=5.0, commands=50, port=14561):
+    autopilot = ReplayedAutopilot(f"udpout:127.0.0.1:{port}")
+    autopilot.start()
+
+    controller = MAVLinkController(f"udpin:127.0.0.1:{port}")
+    attitude_processor = CountingAttitudeProcessor()
+
+    acquisition_thread = DataAcquisitionThread(controller, [attitude_processor, GimbalProcessor()])
+    acquisition_thread.start()
+
+    start_sent, start_count, start_time = autopilot.sent, attitude_processor.count, time.perf_counter()
+    time.sleep(duration)
+    elapsed = time.perf_counter() - start_time
+    processed = attitude_processor.count - start_count
+    sent = autopilot.sent - start_sent
+
+    latencies = []
+    for _ in range(commands):
+        autopilot.command_received.clear()
+
+        command_start = time.perf_counter()
+        controller.gimbal.set_angles(0, -45, 0)
+        send_time = time.perf_counter() - command_start
+
+        if autopilot.command_received.wait(timeout=1.0):
+            latencies.append((send_time, time.perf_counter() - command_start))
+
+    acquisition_thread.stop()
+    autopilot.stop()
+
+    print(f"Stream sent:          {sent / elapsed:.0f} msgs/s")
+    print(f"ATTITUDE processed:   {processed / elapsed:.0f} msgs/s")
+    if latencies:
+        send_times, round_trips = zip(*latencies)
+        print(f"send_packet call:     median {statistics.median(send_times) * 1000:.3f} ms, max {max(send_times) * 1000:.3f} ms")
+        print(f"command delivered:    median {statistics.median(round_trips) * 1000:.3f} ms, max {max(round_trips) * 1000:.3f} ms")
+    print(f"Commands delivered:   {len(latencies)}/{commands}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,84 @@
+import math
+import os
+import sys
+import tempfile
+import time
+
+from pymavlink import mavutil
+
+from control.communication.mavlink.mavlink import DataAcquisitionThread
+from control.communication.mavlink.mavlink.estimator import StateEstimator
+from control.communication.mavlink.mavlink.processor import (
+    AttitudeProcessor,
+    GlobalPositionProcessor,
+    LocalPositionProcessor,
+    GimbalProcessor
+)
+from control.communication.mavlink.mavlink.recorder import TelemetryRecorder, TelemetryReplay
+
+
+class PackedMessage:
+    def __init__(self, buffer):
+        self.buffer = buffer
+
+    def get_msgbuf(self):
+        return self.buffer
+
+
+def create_synthetic_log(path, duration=60.0, rate=200):
+    mav = mavutil.mavlink.MAVLink(None, srcSystem=1, srcComponent=1)
+    start = time.time()
+
+    with TelemetryRecorder(path) as recorder:
+        for step in range(int(duration * rate)):
+            elapsed = step / rate
+            timestamp = start + elapsed
+            boot_ms = int(elapsed * 1000)
+
+            messages = [
+                mav.attitude_encode(boot_ms, 0.05 * math.sin(elapsed), 0.05 * math.cos(elapsed), math.sin(elapsed / 10), 0.01, 0.01, 0.1),
+                mav.vfr_hud_encode(10.0, 10.0, 90, 50, 100.0, 0.0)
+            ]
+            if step % (rate // 50) == 0:
+                messages.append(mav.local_position_ned_encode(boot_ms, 10 * elapsed, 0, -50, 10, 0, 0))
+            if step % (rate // 10) == 0:
+                messages.append(mav.global_position_int_encode(
+                    boot_ms,
+                    int((-35.36 + 10 * elapsed / 111320) * 1e7), int(149.16 * 1e7),
+                    100000, 50000, 1000, 0, 0, 9000
+                ))
+
+            for message in messages:
+                recorder.write(PackedMessage(message.pack(mav)), timestamp)
+
+
+def run(path=None, speed=0):
+    if path is None:
+        path = os.path.join(tempfile.gettempdir(), "synthetic.tlog")
+        if os.path.exists(path):
+            os.remove(path)
+        create_synthetic_log(path)
+
+    replay = TelemetryReplay(path, speed=speed)
+    estimator = StateEstimator()
+
+    acquisition_thread = DataAcquisitionThread(
+        replay,
+        [AttitudeProcessor(), GlobalPositionProcessor(), LocalPositionProcessor(), GimbalProcessor()]
+    )
+    for message_type in estimator.message_types:
+        acquisition_thread.subscribe(estimator, message_type)
+
+    start = time.perf_counter()
+    acquisition_thread.start()
+    while not replay.finished:
+        time.sleep(0.05)
+    elapsed = time.perf_counter() - start
+    acquisition_thread.stop()
+
+    print(f"Replayed {replay.count} messages from {path} in {elapsed:.2f}s")
+    print(f"Throughput: {replay.count / elapsed:.0f} msgs/s")
+
+
+if __name__ == "__main__":
+    run(sys.argv[1] if len(sys.argv) > 1 else None, float(sys.argv[2]) if len(sys.argv) > 2 else 0)
@@ -0,0 +1,119 @@
+import json
+import time
+from dataclasses import asdict
+
+import numpy
+import zmq
+
+from control.communication.drone_data import (
+    DroneData,
+    FDMData,
+    GimbalData,
+    GimbalAxisData,
+    CameraData,
+    RangefinderData
+)
+
+
+def create_drone_data(width=1280, height=720):
+    frame = numpy.random.randint(0, 255, (height, width, 3), dtype=numpy.uint8)
+    depth = numpy.random.randint(0, 65535, (height // 4, width // 4), dtype=numpy.uint16)
+    axis = GimbalAxisData(min=-1.0, max=1.0, current=0.0, target=0.0)
+
+    return DroneData(
+        timestamp=time.time(),
+        fdm=FDMData.create(time.time(), [0.1, 0.2, 0.3], [0.1, 0.2, 0.3], [0.1, 0.2, 9.8], [1, 2, 3], [1, 2, 3]),
+        gimbal=GimbalData(timestamp=time.time(), roll=axis, pitch=axis, yaw=axis),
+        camera=CameraData(
+            timestamp=int(time.time()), width=width, height=height, fps=30.0, fov=1.5,
+            data_type="uint8", frame=frame
+        ),
+        depth=RangefinderData(
+            timestamp=int(time.time()), width=width // 4, height=height // 4, fps=30.0, fov=1.5,
+            min_range=0.1, max_range=100.0, data_type="uint16", frame=depth
+        ),
+        rangefinder=RangefinderData(
+            timestamp=int(time.time()), width=1, height=1, fps=30.0, fov=0.1,
+            min_range=0.1, max_range=100.0, data_type="uint16", frame=depth[:1, :1].copy()
+        )
+    )
+
+
+def legacy_to_json(drone_data):
+    def frame_payload(payload):
+        data = asdict(payload)
+        data.pop("frame")
+        data["frame"] = payload.encode_frame()
+
+        return json.dumps(data)
+
+    return json.dumps({
+        "timestamp": drone_data.timestamp,
+        "fdm": json.loads(json.dumps(asdict(drone_data.fdm))),
+        "gimbal": json.loads(json.dumps({
+            "timestamp": drone_data.gimbal.timestamp,
+            "roll": json.loads(json.dumps(asdict(drone_data.gimbal.roll))),
+            "pitch": json.loads(json.dumps(asdict(drone_data.gimbal.pitch))),
+            "yaw": json.loads(json.dumps(asdict(drone_data.gimbal.yaw)))
+        })),
+        "camera": json.loads(frame_payload(drone_data.camera)),
+        "depth": json.loads(frame_payload(drone_data.depth)),
+        "rangefinder": json.loads(frame_payload(drone_data.rangefinder))
+    })
+
+
+def measure(function, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        function()
+
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def receive_and_decode(requester, replier, payload, backend):
+    requester.send_string("get_data")
+    replier.recv()
+    replier.send(payload)
+
+    return DroneData.decode(requester.recv(), backend)
+
+
+def run(repeats=50):
+    drone_data = create_drone_data()
+
+    producers = {"legacy json": lambda: legacy_to_json(drone_data)}
+    consumers = {}
+
+    for backend in ("json", "msgpack"):
+        try:
+            payload = drone_data.encode(backend)
+        except ImportError as e:
+            print(f"Skipping {backend} backend: {e}")
+            continue
+
+        producers[backend] = lambda backend=backend: drone_data.encode(backend)
+        consumers[backend] = payload.encode() if isinstance(payload, str) else payload
+
+    print(f"{'backend':<14}{'side':<10}{'ms/op':>10}{'bytes':>12}")
+    for name, producer in producers.items():
+        size = len(producer())
+        print(f"{name:<14}{'produce':<10}{measure(producer, repeats):>10.3f}{size:>12}")
+
+    context = zmq.Context()
+    replier = context.socket(zmq.REP)
+    port = replier.bind_to_random_port("tcp://127.0.0.1")
+    requester = context.socket(zmq.REQ)
+    requester.connect(f"tcp://127.0.0.1:{port}")
+
+    try:
+        for name, payload in consumers.items():
+            elapsed = measure(lambda: receive_and_decode(requester, replier, payload, name), repeats)
+            print(f"{name:<14}{'consume':<10}{elapsed:>10.3f}{len(payload):>12}")
+    finally:
+        requester.close()
+        replier.close()
+        context.term()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,54 @@
+import subprocess
+import sys
+
+
+IMPORT_SCRIPT = """
+import time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+application = app.create_app()
+created = time.perf_counter()
+print(f"{imported - start:.3f} {created - imported:.3f}")
+"""
+
+READY_SCRIPT = """
+import time
+start = time.perf_counter()
+import app
+app.core_service.start()
+models_ready = None
+while time.perf_counter() - start < {timeout}:
+    status = app.core_service.readiness()
+    if models_ready is None and status["models"] in ("ready", "failed"):
+        models_ready = time.perf_counter() - start
+    if status["ready"] or status["link"] == "failed" or status["models"] == "failed":
+        break
+    time.sleep(0.05)
+print(f"{{models_ready or float('nan'):.3f}} {{time.perf_counter() - start:.3f}} {{status['link']}} {{status['models']}}")
+"""
+
+
+def run_script(script):
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True)
+    if result.returncode != 0:
+        print(result.stderr.strip().splitlines()[-1])
+        return None
+
+    return result.stdout.strip().splitlines()[-1].split()
+
+
+def run(repeats=3, timeout=60):
+    for _ in range(repeats):
+        timings = run_script(IMPORT_SCRIPT)
+        if timings:
+            print(f"import app: {timings[0]}s, create_app: {timings[1]}s")
+
+    timings = run_script(READY_SCRIPT.format(timeout=timeout))
+    if timings:
+        models_ready, elapsed, link, models = timings
+        print(f"models {models} after {models_ready}s, link {link}, waited {elapsed}s")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
@@ -1,5 +1,14 @@
 import math
-from ultralytics import YOLO
+import threading
+from concurrent.futures import Future
+
+import cv2
+import numpy
+
+from .backend import DetectorBackend
+from .batching import DetectionBatcher
+from .config import DetectorConfig
+from .scene import SceneChangeGate
 from .deep_sort.deep_sort.tracker import Tracker
 from .deep_sort.deep_sort.deep.extractor import Extractor
 from .deep_sort.deep_sort.deep.configuration import ResNetConfiguration
@@ -8,44 +17,70 @@ from .geospatial import GEOSpatial
 
 
 class DroneAnalysisService:
-    def __init__(self, model_path, dem_path, classes=None, detection_threshold=0.25, iou_threshold=0.5, max_detections=10):
-        self.model = YOLO(model_path)
-        self.detection_threshold = detection_threshold
-        self.iou_threshold = iou_threshold
-        self.max_detections = max_detections
-        self.classes = classes
+    def __init__(self, model_path, dem_path, classes=None, detection_threshold=0.25, iou_threshold=0.5, max_detections=10,
+                 backend="torch", input_size=640, tiling=False, tile_overlap=0.2, tile_object_size=1.0,
+                 tile_min_object_pixels=12, tile_change_threshold=4.0, tile_refresh_interval=15,
+                 focus=False, focus_sweep_interval=10, focus_margin=0.5, focus_velocity_gain=2.0,
+                 focus_min_size=160, focus_input_size=320, precision="fp32", reid_quantized_path=None,
+                 scene_gating=False):
+        self.detector = DetectorBackend(model_path, backend, input_size, precision=precision)
+        self.model = self.detector.model
+        self.config = DetectorConfig(detection_threshold, iou_threshold, max_detections, classes)
 
-        resnet = ResNetConfiguration(
-            base="resnet18",
-            weights_path=RESNET18_WEIGHTS,
-            use_cuda=False
-        )
-        self.extractor = Extractor(model=resnet, batch_size=4)
-        self.tracker = Tracker(
-            feature_extractor=self.extractor,
-            max_iou_distance=0.7,
-            max_cosine_distance=0.7
-        )
+        self.tiling = tiling
+        self.tile_overlap = tile_overlap
+        self.tile_object_size = tile_object_size
+        self.tile_min_object_pixels = tile_min_object_pixels
+        self.tile_change_threshold = tile_change_threshold
+        self.tile_refresh_interval = tile_refresh_interval
+        self.tile_cache = {}
+        self.tile_config = None
+
+        self.focus = focus
+        self.focus_sweep_interval = focus_sweep_interval
+        self.focus_margin = focus_margin
+        self.focus_velocity_gain = focus_velocity_gain
+        self.focus_min_size = focus_min_size
+        self.focus_input_size = focus_input_size
+        self.focus_frame_index = 0
+        self.focus_track_count = 0
+
+        self.scene_gate = SceneChangeGate() if scene_gating else None
+        self.last_detections = None
+        self.last_config = None
+
+        self.extractor = self.create_extractor("resnet18", RESNET18_WEIGHTS, reid_quantized_path)
+        self.tracker = self.create_tracker()
+        self.trackers = {None: self.tracker}
+
+        self.batcher = None
+
+        self.swap_lock = threading.Lock()
+        self.pending_models = None
+        self.model_generation = 0
 
         self.geospatial = GEOSpatial(dem_path)
 
-    def predict(self, frame):
-        result = self.model.predict(
-            source=frame,
-            imgsz=frame.shape[:2],
-            classes=self.classes,
-            conf=self.detection_threshold,
-            iou=self.iou_threshold,
-            max_det=self.max_detections,
-            augment=False,
-            agnostic_nms=True,
-            device="cpu",
-            half=False,
-            verbose=False
-        )[0]
+    def update_config(self, config):
+        self.config = config
+
+    def rebuild_config(self, names):
+        config = self.config
+        classes_excluded = [] if config.classes is None else sorted(set(self.model.names) - set(config.classes))
 
+        return DetectorConfig.create(
+            names,
+            config.detection_threshold,
+            config.iou_threshold,
+            config.max_detections,
+            classes_excluded,
+            dict(config.class_thresholds)
+        )
+
+    @staticmethod
+    def to_detections(boxes):
         detections = []
-        for res in result.boxes.data.tolist():
+        for res in boxes.tolist():
             x1, y1, x2, y2, score, class_id = res
             x1, x2, y1, y2 = map(int, (x1, x2, y1, y2))
             class_id = int(class_id)
@@ -53,10 +88,345 @@ class DroneAnalysisService:
 
         return detections
 
-    def update_tracker(self, frame, detections):
-        self.tracker.update(frame, detections)
+    def create_tracker(self):
+        return Tracker(
+            feature_extractor=self.extractor,
+            max_iou_distance=0.7,
+            max_cosine_distance=0.7
+        )
+
+    @staticmethod
+    def create_extractor(base, weights_path=None, quantized_path=None):
+        resnet = ResNetConfiguration(
+            base=base,
+            weights_path=weights_path,
+            use_cuda=False,
+            quantized_path=quantized_path
+        )
+
+        return Extractor(model=resnet, batch_size=4)
+
+    def warm_up(self, iterations=2, detector=None, extractor=None):
+        detector = detector or self.detector
+        extractor = extractor or self.extractor
+
+        height, width = detector.input_size
+        frame = numpy.zeros((height, width, 3), dtype=numpy.uint8)
+
+        for _ in range(iterations):
+            detector.detect(frame, **self.config.detection_arguments())
+        extractor(frame, numpy.array([[0, 0, 64, 128]]))
+
+    def load_models(self, model_path=None, backend="torch", input_size=640, precision="fp32",
+                    reid_base=None, reid_weights_path=None, reid_quantized_path=None):
+        future = Future()
+
+        with self.swap_lock:
+            self.model_generation += 1
+            generation = self.model_generation
+
+        threading.Thread(
+            target=self.prepare_models,
+            args=(future, generation, model_path, backend, input_size, precision, reid_base, reid_weights_path, reid_quantized_path),
+            daemon=True
+        ).start()
+
+        return future
+
+    def prepare_models(self, future, generation, model_path, backend, input_size, precision, reid_base, reid_weights_path, reid_quantized_path):
+        try:
+            detector = DetectorBackend(model_path, backend, input_size, precision=precision) if model_path else None
+            extractor = self.create_extractor(reid_base, reid_weights_path, reid_quantized_path) if reid_base else None
+
+            self.warm_up(detector=detector, extractor=extractor)
+        except Exception as e:
+            print(f"Failed to load models: {e}")
+            if future.set_running_or_notify_cancel():
+                future.set_exception(e)
+            return
+
+        with self.swap_lock:
+            if generation != self.model_generation:
+                future.cancel()
+                return
+
+            if self.pending_models is not None:
+                self.pending_models[2].cancel()
+            self.pending_models = (detector, extractor, future)
+
+    def apply_pending_models(self):
+        with self.swap_lock:
+            pending, self.pending_models = self.pending_models, None
+
+        if pending is None:
+            return
+
+        detector, extractor, future = pending
+        if not future.set_running_or_notify_cancel():
+            return
+
+        if detector is not None:
+            try:
+                config = self.rebuild_config(detector.names)
+            except ValueError as e:
+                print(f"Failed to swap models: {e}")
+                future.set_exception(e)
+                return
+
+            self.config = config
+            self.detector = detector
+            self.model = detector.model
+            self.tile_cache = {}
+            self.last_detections = None
+
+        if extractor is not None:
+            self.extractor = extractor
+            for tracker in self.trackers.values():
+                tracker.set_extractor(extractor)
+
+        future.set_result(True)
+
+    def tracker_for(self, source=None):
+        if source not in self.trackers:
+            self.trackers[source] = self.create_tracker()
+
+        return self.trackers[source]
+
+    def predict(self, frame, config=None):
+        config = config or self.config
+        boxes = self.detector.detect(frame, **config.detection_arguments())
+
+        return self.to_detections(config.filter(boxes))
+
+    def predict_batch(self, frames, config=None):
+        config = config or self.config
+        results = self.detector.detect_batch(frames, **config.detection_arguments())
+
+        return [self.to_detections(config.filter(boxes)) for boxes in results]
+
+    def start_batching(self, max_batch_size=None, max_latency=0.05):
+        if self.batcher is not None:
+            return
+
+        self.batcher = DetectionBatcher(
+            self.predict_batch,
+            self.update_tracker,
+            max_batch_size or self.detector.batch_size,
+            max_latency
+        )
+        self.batcher.start()
+
+    def stop_batching(self):
+        if self.batcher is None:
+            return
+
+        self.batcher.stop()
+        self.batcher.join()
+        self.batcher = None
+
+    def submit(self, frame, source=None):
+        if self.batcher is None:
+            self.start_batching()
+
+        return self.batcher.submit(frame, source)
+
+    def analyse_sources(self, frames):
+        sources = list(frames.keys())
+        detections = self.predict_batch([frames[source] for source in sources])
+
+        return {
+            source: self.update_tracker(frames[source], source_detections, source)
+            for source, source_detections in zip(sources, detections)
+        }
+
+    def tile_size(self, image_width, image_height, altitude, fov_horizontal):
+        input_height, input_width = self.detector.input_size
+        downscale = max(image_width / input_width, image_height / input_height, 1)
+
+        if not altitude or altitude <= 0:
+            return image_width, image_height
+
+        ground_width = 2 * altitude * math.tan(fov_horizontal / 2)
+        object_pixels = self.tile_object_size * image_width / ground_width
+        tile_scale = min(max(object_pixels / self.tile_min_object_pixels, 1), downscale)
+
+        return min(image_width, round(input_width * tile_scale)), min(image_height, round(input_height * tile_scale))
+
+    def tile_positions(self, length, tile):
+        if tile >= length:
+            return [0]
+
+        count = math.ceil((length - tile * self.tile_overlap) / (tile * (1 - self.tile_overlap)))
+
+        return numpy.linspace(0, length - tile, count).round().astype(int).tolist()
+
+    def tile_grid(self, image_width, image_height, altitude, fov_horizontal):
+        tile_width, tile_height = self.tile_size(image_width, image_height, altitude, fov_horizontal)
+
+        return [
+            (x, y, x + tile_width, y + tile_height)
+            for y in self.tile_positions(image_height, tile_height)
+            for x in self.tile_positions(image_width, tile_width)
+        ]
+
+    @staticmethod
+    def tile_thumbnail(tile):
+        gray = cv2.cvtColor(tile, cv2.COLOR_BGR2GRAY) if tile.ndim == 3 else tile
+
+        return cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA).astype(numpy.int16)
+
+    def is_tile_changed(self, rectangle, thumbnail):
+        cached = self.tile_cache.get(rectangle)
+        if cached is None:
+            return True
+
+        cached_thumbnail, _, age = cached
+        if age >= self.tile_refresh_interval:
+            return True
+
+        return numpy.abs(thumbnail - cached_thumbnail).mean() > self.tile_change_threshold
+
+    @staticmethod
+    def merge_detections(boxes, config):
+        if len(boxes) == 0:
+            return boxes
+
+        rectangles = numpy.column_stack((boxes[:, :2], boxes[:, 2:4] - boxes[:, :2]))
+        keep = cv2.dnn.NMSBoxesBatched(
+            rectangles.tolist(),
+            boxes[:, 4].tolist(),
+            boxes[:, 5].astype(int).tolist(),
+            config.minimum_threshold,
+            config.iou_threshold
+        )
+        keep = numpy.asarray(keep, dtype=int).reshape(-1)
+        keep = keep[numpy.argsort(-boxes[keep, 4])][:config.max_detections]
+
+        return boxes[keep]
+
+    def predict_tiled(self, frame, altitude, fov_horizontal, config=None):
+        config = config or self.config
+        image_height, image_width = frame.shape[:2]
+        grid = self.tile_grid(image_width, image_height, altitude, fov_horizontal)
+
+        if len(grid) == 1:
+            self.tile_cache = {}
+            return self.predict(frame, config)
+
+        if self.tile_config is not config:
+            self.tile_cache = {}
+            self.tile_config = config
+
+        tile_cache = {}
+        changed = []
+        for rectangle in grid:
+            x1, y1, x2, y2 = rectangle
+            thumbnail = self.tile_thumbnail(frame[y1:y2, x1:x2])
+
+            if self.is_tile_changed(rectangle, thumbnail):
+                changed.append((rectangle, thumbnail))
+            else:
+                cached_thumbnail, cached_boxes, age = self.tile_cache[rectangle]
+                tile_cache[rectangle] = (cached_thumbnail, cached_boxes, age + 1)
+
+        if changed:
+            tiles = [frame[y1:y2, x1:x2] for (x1, y1, x2, y2), _ in changed]
+            results = self.detector.detect_batch(tiles, **config.detection_arguments())
+
+            for ((x1, y1, x2, y2), thumbnail), boxes in zip(changed, results):
+                boxes = config.filter(boxes)
+                boxes[:, [0, 2]] += x1
+                boxes[:, [1, 3]] += y1
+                tile_cache[(x1, y1, x2, y2)] = (thumbnail, boxes, 0)
+
+        self.tile_cache = tile_cache
+
+        boxes = numpy.concatenate([boxes for _, boxes, _ in tile_cache.values()])
+
+        return self.to_detections(self.merge_detections(boxes, config))
+
+    def focus_regions(self, boxes, image_width, image_height):
+        x1, y1, x2, y2, vx, vy = boxes.T
+
+        half_width = numpy.maximum(
+            (x2 - x1) * (0.5 + self.focus_margin) + numpy.abs(vx) * self.focus_velocity_gain,
+            self.focus_min_size / 2
+        )
+        half_height = numpy.maximum(
+            (y2 - y1) * (0.5 + self.focus_margin) + numpy.abs(vy) * self.focus_velocity_gain,
+            self.focus_min_size / 2
+        )
+        center_x, center_y = (x1 + x2) / 2, (y1 + y2) / 2
+
+        regions = numpy.column_stack((
+            (center_x - half_width).clip(0, image_width),
+            (center_y - half_height).clip(0, image_height),
+            (center_x + half_width).clip(0, image_width),
+            (center_y + half_height).clip(0, image_height)
+        )).round().astype(int)
+
+        return regions[(regions[:, 2] > regions[:, 0]) & (regions[:, 3] > regions[:, 1])]
+
+    def is_sweep_due(self, track_count):
+        sweep = (
+            self.focus_frame_index % self.focus_sweep_interval == 0 or
+            track_count == 0 or
+            track_count < self.focus_track_count
+        )
+
+        self.focus_frame_index += 1
+        self.focus_track_count = track_count
+
+        return sweep
+
+    def predict_focused(self, frame, boxes, config=None):
+        config = config or self.config
+        image_height, image_width = frame.shape[:2]
+        regions = self.focus_regions(boxes, image_width, image_height)
+        if len(regions) == 0:
+            return []
+
+        crops = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in regions]
+        results = self.detector.detect_batch(crops, self.focus_input_size, **config.detection_arguments())
+        results = [config.filter(result) for result in results]
+
+        for (x1, y1, _, _), result in zip(regions, results):
+            result[:, [0, 2]] += x1
+            result[:, [1, 3]] += y1
+
+        return self.to_detections(self.merge_detections(numpy.concatenate(results), config))
+
+    def detect(self, frame, altitude=None, fov_horizontal=None, attitude=None, global_position=None):
+        config = self.config
+
+        if self.scene_gate is not None:
+            static = self.scene_gate.is_static(frame, attitude, global_position)
+            if static and self.last_detections is not None and self.last_config is config:
+                return self.last_detections
+
+        detections = self.run_detection(frame, altitude, fov_horizontal, config)
+
+        self.last_detections = detections
+        self.last_config = config
+
+        return detections
+
+    def run_detection(self, frame, altitude, fov_horizontal, config):
+        if self.focus:
+            boxes = self.tracker.predicted_boxes()
+            if not self.is_sweep_due(len(boxes)):
+                return self.predict_focused(frame, boxes, config)
+
+        if self.tiling and altitude is not None:
+            return self.predict_tiled(frame, altitude, fov_horizontal, config)
+
+        return self.predict(frame, config)
+
+    def update_tracker(self, frame, detections, source=None):
+        tracker = self.tracker_for(source)
+        tracker.update(frame, detections)
 
-        return self.tracker.tracks
+        return tracker.tracks
 
     def geospatial_analysis(self, tracks, image_width, image_height, fov_horizontal, fov_vertical, gimbal_data, attitude_data, global_position_data):
         gimbal_roll, gimbal_pitch, gimbal_yaw = gimbal_data.quaternion.to_euler()
@@ -0,0 +1,196 @@
+import hashlib
+import os
+import shutil
+import threading
+
+import cv2
+import numpy
+from ultralytics import YOLO
+
+
+BACKEND_FORMATS = {
+    "torch": None,
+    "onnx": "onnx",
+    "opencv": "onnx",
+    "openvino": "openvino"
+}
+
+PRECISIONS = {
+    "torch": ["fp32"],
+    "onnx": ["fp32"],
+    "opencv": ["fp32"],
+    "openvino": ["fp32", "int8"]
+}
+
+EXPORT_SUFFIXES = {
+    "onnx": ".onnx",
+    "openvino": "_openvino_model"
+}
+
+LETTERBOX_FILL = 114
+
+
+class Letterbox:
+    def __init__(self, input_size, fill=LETTERBOX_FILL):
+        self.input_size = input_size
+        self.fill = fill
+
+        height, width = input_size
+        self.buffer = numpy.full((height, width, 3), fill, dtype=numpy.uint8)
+
+        self.source_shape = None
+        self.scale = 1.0
+        self.offset = (0, 0)
+        self.region = self.buffer
+        self.resized = None
+
+    def configure(self, shape):
+        if shape == self.source_shape:
+            return
+
+        input_height, input_width = self.input_size
+        height, width = shape[:2]
+
+        scale = min(input_height / height, input_width / width)
+        resized_height, resized_width = round(height * scale), round(width * scale)
+        top, left = (input_height - resized_height) // 2, (input_width - resized_width) // 2
+
+        self.buffer[:] = self.fill
+        self.region = self.buffer[top:top + resized_height, left:left + resized_width]
+        self.resized = None if self.region.flags.c_contiguous else numpy.empty_like(self.region)
+
+        self.source_shape = shape
+        self.scale = scale
+        self.offset = (left, top)
+
+    def __call__(self, frame):
+        if frame.shape[:2] == self.input_size:
+            self.configure(frame.shape)
+            return frame
+
+        self.configure(frame.shape)
+
+        size = (self.region.shape[1], self.region.shape[0])
+        if self.resized is None:
+            cv2.resize(frame, size, dst=self.region, interpolation=cv2.INTER_LINEAR)
+        else:
+            cv2.resize(frame, size, dst=self.resized, interpolation=cv2.INTER_LINEAR)
+            self.region[...] = self.resized
+
+        return self.buffer
+
+    def restore(self, boxes):
+        left, top = self.offset
+        height, width = self.source_shape[:2]
+
+        boxes[:, [0, 2]] = ((boxes[:, [0, 2]] - left) / self.scale).clip(0, width)
+        boxes[:, [1, 3]] = ((boxes[:, [1, 3]] - top) / self.scale).clip(0, height)
+
+        return boxes
+
+
+class DetectorBackend:
+    def __init__(self, model_path, backend="torch", input_size=640, batch_size=8, precision="fp32"):
+        if backend not in BACKEND_FORMATS:
+            raise ValueError(f"Backend {backend} is not supported. Choose from {list(BACKEND_FORMATS.keys())}.")
+        if precision not in PRECISIONS[backend]:
+            raise ValueError(f"Precision {precision} is not supported by {backend}. Choose from {PRECISIONS[backend]}.")
+
+        self.model_path = model_path
+        self.backend = backend
+        self.precision = precision
+        self.input_size = self._normalize_size(input_size)
+        self.batch_size = batch_size if BACKEND_FORMATS[backend] is None else 1
+        self.letterboxes = {}
+        self.lock = threading.Lock()
+
+        self.artifact_path = self.prepare_artifact()
+        self.model = YOLO(self.artifact_path, task="detect")
+
+    @staticmethod
+    def _normalize_size(input_size):
+        if isinstance(input_size, int):
+            return input_size, input_size
+
+        return tuple(input_size)
+
+    def model_hash(self, length=12):
+        digest = hashlib.sha256()
+        with open(self.model_path, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                digest.update(chunk)
+
+        return digest.hexdigest()[:length]
+
+    def cached_artifact_path(self, backend=None, precision=None):
+        export_format = BACKEND_FORMATS[backend or self.backend]
+        precision = precision or self.precision
+        base, _ = os.path.splitext(self.model_path)
+        height, width = self.input_size
+        suffix = "" if precision == "fp32" else f"-{precision}"
+
+        return f"{base}-{self.model_hash()}-{height}x{width}{suffix}{EXPORT_SUFFIXES[export_format]}"
+
+    def prepare_artifact(self):
+        export_format = BACKEND_FORMATS[self.backend]
+        if export_format is None:
+            return self.model_path
+
+        cached_path = self.cached_artifact_path()
+        if os.path.exists(cached_path):
+            return cached_path
+
+        if self.precision != "fp32":
+            raise FileNotFoundError(
+                f"No {self.precision} artifact at {cached_path}, create it with python -m control.analysis.quantization"
+            )
+
+        exported_path = YOLO(self.model_path).export(
+            format=export_format,
+            imgsz=list(self.input_size),
+            dynamic=False,
+            half=False,
+            device="cpu"
+        )
+        shutil.move(exported_path, cached_path)
+
+        return cached_path
+
+    @property
+    def names(self):
+        return self.model.names
+
+    def predict(self, frame, input_size=None, **kwargs):
+        return self.model.predict(
+            source=frame,
+            imgsz=list(input_size or self.input_size),
+            dnn=self.backend == "opencv",
+            device="cpu",
+            half=False,
+            verbose=False,
+            **kwargs
+        )
+
+    def detect(self, frame, input_size=None, **kwargs):
+        return self.detect_batch([frame], input_size, **kwargs)[0]
+
+    def detect_batch(self, frames, input_size=None, **kwargs):
+        if input_size is None or BACKEND_FORMATS[self.backend] is not None:
+            input_size = self.input_size
+        input_size = self._normalize_size(input_size)
+
+        with self.lock:
+            letterboxes = self.letterboxes.setdefault(input_size, [])
+            while len(letterboxes) < len(frames):
+                letterboxes.append(Letterbox(input_size))
+
+            inputs = [letterbox(frame) for letterbox, frame in zip(letterboxes, frames)]
+
+            results = []
+            for start in range(0, len(inputs), self.batch_size):
+                results.extend(self.predict(inputs[start:start + self.batch_size], input_size, **kwargs))
+
+            return [
+                letterbox.restore(result.boxes.data.cpu().numpy())
+                for letterbox, result in zip(letterboxes, results)
+            ]
@@ -0,0 +1,73 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class DetectionBatcher(threading.Thread):
+    def __init__(self, predict_batch, update_source=None, max_batch_size=8, max_latency=0.05, poll_interval=0.1):
+        super().__init__(daemon=True)
+
+        self.predict_batch = predict_batch
+        self.update_source = update_source
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.poll_interval = poll_interval
+
+        self.requests = queue.Queue()
+        self.running = True
+
+    def submit(self, frame, source=None):
+        future = Future()
+        self.requests.put((source, frame, future))
+
+        return future
+
+    def collect(self):
+        batch = [self.requests.get(timeout=self.poll_interval)]
+        deadline = time.monotonic() + self.max_latency
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+
+            try:
+                batch.append(self.requests.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def run(self):
+        while self.running:
+            try:
+                batch = self.collect()
+            except queue.Empty:
+                continue
+
+            batch = [request for request in batch if request[2].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            try:
+                results = self.predict_batch([frame for _, frame, _ in batch])
+            except Exception as e:
+                print(f"Batched detection failed: {e}")
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (source, frame, future), detections in zip(batch, results):
+                if self.update_source is None:
+                    future.set_result(detections)
+                    continue
+
+                try:
+                    future.set_result(self.update_source(frame, detections, source))
+                except Exception as e:
+                    print(f"Updating source {source} failed: {e}")
+                    future.set_exception(e)
+
+    def stop(self):
+        self.running = False
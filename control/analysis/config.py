@@ -0,0 +1,83 @@
+from dataclasses import dataclass, field
+
+import numpy
+
+
+CANDIDATE_LIMIT = 300
+
+
+@dataclass(frozen=True)
+class DetectorConfig:
+    detection_threshold: float = 0.25
+    iou_threshold: float = 0.5
+    max_detections: int = 10
+    classes: tuple = None
+    class_thresholds: tuple = ()
+    threshold_table: numpy.ndarray = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if not 0 <= self.detection_threshold <= 1:
+            raise ValueError(f"Detection threshold {self.detection_threshold} must be within [0, 1]")
+        if not 0 < self.iou_threshold <= 1:
+            raise ValueError(f"IoU threshold {self.iou_threshold} must be within (0, 1]")
+        if self.max_detections < 1:
+            raise ValueError(f"Detection limit {self.max_detections} must be positive")
+
+        class_thresholds = tuple(sorted((int(class_id), float(threshold)) for class_id, threshold in dict(self.class_thresholds).items()))
+        for class_id, threshold in class_thresholds:
+            if class_id < 0 or not 0 <= threshold <= 1:
+                raise ValueError(f"Class threshold {class_id}:{threshold} is invalid")
+
+        classes = None if self.classes is None else tuple(sorted(int(class_id) for class_id in self.classes))
+
+        size = max((class_id for class_id, _ in class_thresholds), default=-1) + 2
+        threshold_table = numpy.full(size, self.detection_threshold, dtype=numpy.float64)
+        for class_id, threshold in class_thresholds:
+            threshold_table[class_id] = threshold
+        threshold_table.flags.writeable = False
+
+        object.__setattr__(self, "classes", classes)
+        object.__setattr__(self, "class_thresholds", class_thresholds)
+        object.__setattr__(self, "threshold_table", threshold_table)
+
+    @classmethod
+    def create(cls, names, detection_threshold, iou_threshold, max_detections, classes_excluded=(), class_thresholds=None):
+        class_thresholds = dict(class_thresholds or {})
+
+        unknown = set(class_thresholds) - set(names)
+        if unknown:
+            raise ValueError(f"Unknown classes in thresholds: {sorted(unknown)}")
+
+        class_ids = numpy.fromiter(names.keys(), dtype=int)
+        classes = class_ids[~numpy.isin(class_ids, list(classes_excluded))]
+
+        return cls(
+            detection_threshold=detection_threshold,
+            iou_threshold=iou_threshold,
+            max_detections=max_detections,
+            classes=classes.tolist(),
+            class_thresholds=class_thresholds
+        )
+
+    @property
+    def minimum_threshold(self):
+        return float(self.threshold_table.min())
+
+    def detection_arguments(self):
+        return {
+            "classes": None if self.classes is None else list(self.classes),
+            "conf": self.minimum_threshold,
+            "iou": self.iou_threshold,
+            "max_det": max(self.max_detections, CANDIDATE_LIMIT) if self.class_thresholds else self.max_detections,
+            "augment": False,
+            "agnostic_nms": True
+        }
+
+    def filter(self, boxes):
+        if not self.class_thresholds or len(boxes) == 0:
+            return boxes
+
+        class_ids = numpy.minimum(boxes[:, 5].astype(int), len(self.threshold_table) - 1)
+        boxes = boxes[boxes[:, 4] >= self.threshold_table[class_ids]]
+
+        return boxes[numpy.argsort(-boxes[:, 4], kind="stable")[:self.max_detections]]
@@ -10,8 +10,8 @@ from torchvision.models import (
 
 
 class ResNetConfiguration(FeatureModel):
-    def __init__(self, base="resnet18", weights_path=None, use_cuda=False):
-        super(ResNetConfiguration, self).__init__(use_cuda=use_cuda)
+    def __init__(self, base="resnet18", weights_path=None, use_cuda=False, quantized_path=None):
+        super(ResNetConfiguration, self).__init__(use_cuda=use_cuda and quantized_path is None)
 
         self._models = {
             "resnet18": {
@@ -37,6 +37,8 @@ class ResNetConfiguration(FeatureModel):
 
         self.feature_layer = "avgpool"
 
+        self.quantized_path = quantized_path
+
         self._preprocessor = transforms.Compose([
             transforms.Resize(self.input_shape),
             transforms.ToTensor(),
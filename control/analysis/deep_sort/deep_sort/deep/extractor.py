@@ -13,6 +13,9 @@ class Extractor(object):
         self.extractor = self.create_extractor()
 
     def create_extractor(self):
+        if getattr(self.model, "quantized_path", None):
+            return torch.jit.load(self.model.quantized_path, map_location="cpu").eval()
+
         return create_feature_extractor(self.model.model_base, return_nodes={self.model.feature_layer: self.model.feature_layer})
 
     def prepare_patches(self, frame, boxes):
@@ -43,8 +43,39 @@ class Tracker:
             self.extractor = Extractor(model=resnet, batch_size=batch_size)
 
         self.tracks = None
+        self.reseed_pending = False
+
+    def set_extractor(self, extractor):
+        self.extractor = extractor
+        self.reseed_pending = True
+
+    def reseed_features(self, frame):
+        self.reseed_pending = False
+
+        height, width = frame.shape[:2]
+
+        tracks, boxes = [], []
+        for track in self.tracker.tracks:
+            x1, y1, x2, y2 = np.clip(track.to_tlbr(), 0, [width, height, width, height])
+            if x2 - x1 >= 1 and y2 - y1 >= 1:
+                tracks.append(track)
+                boxes.append((x1, y1, x2 - x1, y2 - y1))
+
+        self.tracker.tracks = tracks
+        if not tracks:
+            self.metric.samples = {}
+            return
+
+        features = self.extractor(frame, np.asarray(boxes))
+
+        self.metric.samples = {track.track_id: [feature] for track, feature in zip(tracks, features)}
+        for track in tracks:
+            track.features = []
 
     def update(self, frame, detections):
+        if self.reseed_pending:
+            self.reseed_features(frame)
+
         if len(detections) == 0:
             self.tracker.predict()
             self.tracker.update([])
@@ -71,6 +102,19 @@ class Tracker:
 
         self.update_tracks()
 
+    def predicted_boxes(self):
+        boxes = []
+        for track in self.tracker.tracks:
+            if not track.is_confirmed():
+                continue
+
+            x, y, aspect, height = track.mean[:4] + track.mean[4:]
+            vx, vy = track.mean[4:6]
+            width = aspect * height
+            boxes.append((x - width / 2, y - height / 2, x + width / 2, y + height / 2, vx, vy))
+
+        return np.asarray(boxes, dtype=np.float64).reshape(-1, 6)
+
     def update_tracks(self):
         tracks = []
         for track in self.tracker.tracks:
@@ -0,0 +1,213 @@
+import argparse
+import copy
+import glob
+import os
+import shutil
+import tempfile
+import time
+
+import cv2
+import numpy
+import torch
+from PIL import Image
+from torch.ao.quantization import get_default_qconfig_mapping
+from torch.ao.quantization.quantize_fx import prepare_fx, convert_fx
+from torchvision.models.feature_extraction import create_feature_extractor
+
+from .backend import DetectorBackend
+from .deep_sort.deep_sort.deep.configuration import ResNetConfiguration
+from .deep_sort.deep_sort.deep.weights import RESNET18_WEIGHTS
+
+
+def load_frames_from_directory(directory, limit=300):
+    paths = sorted(glob.glob(os.path.join(directory, "*.jpg")) + glob.glob(os.path.join(directory, "*.png")))
+
+    return [cv2.imread(path) for path in paths[:limit]]
+
+
+def load_frames_from_database(limit=300):
+    from app import create_app
+    from models.image import Image as RecordedImage
+
+    with create_app().app_context():
+        images = RecordedImage.query.order_by(RecordedImage.id.desc()).limit(limit).all()
+
+        return [cv2.imdecode(numpy.frombuffer(image.image, numpy.uint8), cv2.IMREAD_COLOR) for image in images]
+
+
+def write_calibration_dataset(frames, directory, names):
+    image_directory = os.path.join(directory, "images")
+    os.makedirs(image_directory, exist_ok=True)
+
+    for index, frame in enumerate(frames):
+        cv2.imwrite(os.path.join(image_directory, f"{index:05d}.jpg"), frame)
+
+    data_path = os.path.join(directory, "calibration.yaml")
+    with open(data_path, "w") as file:
+        file.write(f"path: {directory}\ntrain: images\nval: images\nnames:\n")
+        for class_id, name in names.items():
+            file.write(f"  {class_id}: {name}\n")
+
+    return data_path
+
+
+def quantize_detector(model_path, frames, input_size=640):
+    detector = DetectorBackend(model_path, "torch", input_size)
+    cached_path = detector.cached_artifact_path("openvino", "int8")
+
+    with tempfile.TemporaryDirectory() as directory:
+        data_path = write_calibration_dataset(frames, directory, detector.names)
+        exported_path = detector.model.export(
+            format="openvino",
+            imgsz=list(detector.input_size),
+            int8=True,
+            data=data_path,
+            dynamic=False,
+            device="cpu"
+        )
+        if os.path.isdir(cached_path):
+            shutil.rmtree(cached_path)
+        shutil.move(exported_path, cached_path)
+
+    return cached_path
+
+
+def reid_int8_path(weights_path):
+    base, _ = os.path.splitext(weights_path)
+
+    return f"{base}-int8.pt"
+
+
+def calibration_patches(frames, detector, configuration, limit=512):
+    patches = []
+    for frame in frames:
+        for x1, y1, x2, y2, _, _ in detector.detect(frame, conf=0.25).astype(int):
+            if x2 - x1 < 4 or y2 - y1 < 4:
+                continue
+
+            patch = cv2.resize(frame[y1:y2, x1:x2], configuration.input_shape)
+            patches.append(configuration.preprocess(Image.fromarray(patch)))
+
+            if len(patches) >= limit:
+                return torch.stack(patches)
+
+    return torch.stack(patches) if patches else None
+
+
+def quantize_reid(configuration, patches, output_path, batch_size=16):
+    extractor = create_feature_extractor(
+        copy.deepcopy(configuration.model_base).eval(),
+        return_nodes={configuration.feature_layer: configuration.feature_layer}
+    )
+
+    prepared = prepare_fx(extractor, get_default_qconfig_mapping("x86"), example_inputs=(patches[:1],))
+    with torch.no_grad():
+        for start in range(0, len(patches), batch_size):
+            prepared(patches[start:start + batch_size])
+
+    quantized = convert_fx(prepared)
+    traced = torch.jit.trace(quantized, patches[:1], strict=False)
+    torch.jit.save(traced, output_path)
+
+    return output_path
+
+
+def measure(function, inputs, repeats=3):
+    function(inputs[0])
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        outputs = [function(item) for item in inputs]
+    elapsed = (time.perf_counter() - start) / (repeats * len(inputs))
+
+    return outputs, elapsed * 1000
+
+
+def detector_report(model_path, frames, input_size, data=None):
+    rows = []
+    for name, detector in (
+        ("fp32", DetectorBackend(model_path, "torch", input_size)),
+        ("int8", DetectorBackend(model_path, "openvino", input_size, precision="int8"))
+    ):
+        _, latency = measure(detector.detect, frames[:20])
+        if data:
+            metrics = detector.model.val(data=data, imgsz=max(detector.input_size), batch=1, device="cpu", plots=False, verbose=False)
+            accuracy = metrics.box.map50
+        else:
+            accuracy = float("nan")
+
+        rows.append((f"yolo {name}", latency, accuracy))
+
+    return rows
+
+
+def reid_report(configuration, int8_path, patches):
+    reference = create_feature_extractor(
+        copy.deepcopy(configuration.model_base).eval(),
+        return_nodes={configuration.feature_layer: configuration.feature_layer}
+    )
+    quantized = torch.jit.load(int8_path)
+    batches = list(torch.split(patches, 16))
+    batch_size = len(patches) / len(batches)
+
+    with torch.no_grad():
+        reference_features, reference_latency = measure(lambda x: reference(x)[configuration.feature_layer].flatten(1), batches)
+        quantized_features, quantized_latency = measure(lambda x: quantized(x)[configuration.feature_layer].flatten(1), batches)
+
+    reference_features = torch.nn.functional.normalize(torch.cat(reference_features), dim=1)
+    quantized_features = torch.nn.functional.normalize(torch.cat(quantized_features), dim=1)
+
+    similarity = (reference_features * quantized_features).sum(dim=1).mean().item()
+
+    reference_neighbours = (reference_features @ reference_features.T).fill_diagonal_(-1).argmax(dim=1)
+    quantized_neighbours = (quantized_features @ quantized_features.T).fill_diagonal_(-1).argmax(dim=1)
+    rank1_agreement = (reference_neighbours == quantized_neighbours).float().mean().item()
+
+    return [
+        ("reid fp32", reference_latency / batch_size, 1.0),
+        ("reid int8", quantized_latency / batch_size, rank1_agreement),
+        ("reid cosine fp32/int8", float("nan"), similarity)
+    ]
+
+
+def run(model_path, weights_path, frames, input_size=640, data=None):
+    print(f"Calibrating on {len(frames)} frames")
+
+    int8_detector_path = quantize_detector(model_path, frames, input_size)
+    print(f"Detector written to {int8_detector_path}")
+
+    detector = DetectorBackend(model_path, "torch", input_size)
+    configuration = ResNetConfiguration(base="resnet18", weights_path=weights_path, use_cuda=False)
+    patches = calibration_patches(frames, detector, configuration)
+    if patches is None:
+        print("No detections in calibration frames, ReID model was not quantized")
+        return
+
+    int8_reid_path = quantize_reid(configuration, patches, reid_int8_path(weights_path))
+    print(f"ReID model written to {int8_reid_path}")
+
+    rows = detector_report(model_path, frames, input_size, data)
+    rows += reid_report(configuration, int8_reid_path, patches)
+
+    print(f"{'model':<24} {'latency ms':>11} {'accuracy':>9}")
+    for name, latency, accuracy in rows:
+        print(f"{name:<24} {latency:>11.2f} {accuracy:>9.3f}")
+    print("Detector accuracy is mAP50 on --data, ReID accuracy is rank-1 neighbour agreement with fp32")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="control/analysis/yolov8n-visdrone.pt")
+    parser.add_argument("--reid-weights", default=RESNET18_WEIGHTS)
+    parser.add_argument("--frames", help="directory of calibration frames, recorded flight images are used when omitted")
+    parser.add_argument("--limit", type=int, default=300)
+    parser.add_argument("--input-size", type=int, default=640)
+    parser.add_argument("--data", help="dataset yaml used for the detector mAP report")
+    args = parser.parse_args()
+
+    if args.frames:
+        calibration_frames = load_frames_from_directory(args.frames, args.limit)
+    else:
+        calibration_frames = load_frames_from_database(args.limit)
+
+    run(args.model, args.reid_weights, calibration_frames, args.input_size, args.data)
@@ -0,0 +1,59 @@
+import math
+
+import cv2
+
+
+class SceneChangeGate:
+    def __init__(self, size=(64, 36), pixel_threshold=3.0, angular_rate_threshold=0.02, velocity_threshold=0.3,
+                 max_skipped=30):
+        self.size = size
+        self.pixel_threshold = pixel_threshold
+        self.angular_rate_threshold = angular_rate_threshold
+        self.velocity_threshold = velocity_threshold
+        self.max_skipped = max_skipped
+
+        self.reference = None
+        self.skipped = 0
+
+    def thumbnail(self, frame):
+        width, height = self.size
+        sampled = cv2.resize(frame, (width * 4, height * 4), interpolation=cv2.INTER_NEAREST)
+        small = cv2.resize(sampled, self.size, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+        return small
+
+    def is_moving(self, attitude, global_position):
+        if attitude is None or global_position is None:
+            return True
+
+        rates = (attitude.roll_speed, attitude.pitch_speed, attitude.yaw_speed)
+        if any(rate is None or abs(rate) > self.angular_rate_threshold for rate in rates):
+            return True
+
+        speed = math.sqrt(global_position.vx ** 2 + global_position.vy ** 2 + global_position.vz ** 2)
+
+        return speed > self.velocity_threshold
+
+    def is_static(self, frame, attitude=None, global_position=None):
+        thumbnail = self.thumbnail(frame)
+
+        static = (
+            self.reference is not None and
+            self.skipped < self.max_skipped and
+            not self.is_moving(attitude, global_position) and
+            float(cv2.absdiff(thumbnail, self.reference).mean()) <= self.pixel_threshold
+        )
+
+        if static:
+            self.skipped += 1
+        else:
+            self.reference = thumbnail
+            self.skipped = 0
+
+        return static
+
+    def reset(self):
+        self.reference = None
+        self.skipped = 0
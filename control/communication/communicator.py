@@ -1,12 +1,25 @@
-from .mavlink.mavlink import MAVLinkController, DataAcquisitionThread
+from .mavlink.mavlink import MAVLinkController, DataAcquisitionThread, CommandScheduler
 from .mavlink.mavlink.processor import GimbalProcessor, GlobalPositionProcessor, AttitudeProcessor
-from .data_stream import StreamReceiver
+from .mavlink.mavlink.data import MAVLinkDataType
+from .mavlink.mavlink.estimator import StateEstimator
+from .data_stream import PrefetchStreamReceiver
 from .drone_data import DroneData
 
 
+MESSAGE_RATES = {
+    MAVLinkDataType.ATTITUDE.value: 50,
+    MAVLinkDataType.GIMBAL.value: 50,
+    MAVLinkDataType.GLOBAL_POSITION.value: 20,
+    MAVLinkDataType.LOCAL_POSITION.value: 50
+}
+
+
 class DroneDataService:
-    def __init__(self, mavlink_connection_str, host, port):
+    def __init__(self, mavlink_connection_str, host, port, frame_ring=None, serialization="json", frame_scale=1,
+                 message_rates=None, router_endpoints=None):
         self.mavlink_connection = MAVLinkController(mavlink_connection_str)
+        if router_endpoints:
+            self.mavlink_connection.start_router(router_endpoints)
 
         self.attitude_processor = AttitudeProcessor()
         self.global_position_processor = GlobalPositionProcessor()
@@ -20,14 +33,52 @@ class DroneDataService:
                 self.gimbal_processor
             ]
         )
+
+        self.state_estimator = StateEstimator()
+        for message_type in self.state_estimator.message_types:
+            self.acquisition_thread.subscribe(self.state_estimator, message_type)
+
+        self.command_scheduler = CommandScheduler(self.mavlink_connection)
+        self.acquisition_thread.subscribe(self.command_scheduler, "COMMAND_ACK")
+        self.command_scheduler.start()
+
         self.acquisition_thread.start()
 
-        self.stream_receiver = StreamReceiver(host, port)
+        self.message_rates = {**MESSAGE_RATES, **(message_rates or {})}
+        subscribed_types = set(self.acquisition_thread.message_types())
+        self.mavlink_connection.negotiate_message_rates(
+            {
+                message_type: rate
+                for message_type, rate in self.message_rates.items()
+                if message_type in subscribed_types
+            },
+            stop_unused=not router_endpoints
+        )
+
+        self.frame_ring = frame_ring
+        self.serialization = serialization
+        self.frame_scale = frame_scale
+        self.stream_receiver = PrefetchStreamReceiver(
+            host, port,
+            decoder=self.decode_drone_data,
+            raw=True
+        )
 
-    def get_mavlink_data(self):
-        attitude_data = self.attitude_processor.get_data()
-        position_data = self.global_position_processor.get_data()
-        gimbal_data = self.gimbal_processor.get_data()
+    def get_mavlink_data(self, timestamp=None, max_extrapolation=0.1):
+        if timestamp is None:
+            attitude_data = self.attitude_processor.get_data()
+            position_data = self.global_position_processor.get_data()
+            gimbal_data = self.gimbal_processor.get_data()
+        else:
+            attitude_data = self.attitude_processor.get_data_at(timestamp, max_extrapolation)
+            position_data = self.global_position_processor.get_data_at(timestamp, max_extrapolation)
+            gimbal_data = self.gimbal_processor.get_data_at(timestamp, max_extrapolation)
+
+            latest_attitude = self.attitude_processor.get_data()
+            if latest_attitude is not None and timestamp > latest_attitude.timestamp:
+                predicted_position, predicted_attitude = self.predict_state(timestamp)
+                attitude_data = predicted_attitude or attitude_data
+                position_data = predicted_position or position_data
 
         return {
             "attitude": attitude_data,
@@ -35,9 +86,27 @@ class DroneDataService:
             "gimbal": gimbal_data
         }
 
+    def predict_state(self, timestamp=None):
+        return self.state_estimator.predict(timestamp)
+
+    def decode_drone_data(self, data):
+        drone_data = DroneData.decode(data, self.serialization, self.frame_scale)
+
+        if self.frame_ring is not None:
+            sequence = self.frame_ring.write(drone_data.camera.frame, drone_data.camera.timestamp)
+            drone_data.camera.frame = self.frame_ring.get(sequence)
+            drone_data.camera.sequence = sequence
+
+        return drone_data
+
+    def frame_is_valid(self, sequence):
+        if self.frame_ring is None or sequence is None:
+            return True
+
+        return self.frame_ring.is_valid(sequence)
+
     def get_drone_data(self):
-        data = self.stream_receiver.get_data()
-        drone_data = DroneData.from_json(data)
+        drone_data = self.stream_receiver.get_data()
 
         return drone_data
 
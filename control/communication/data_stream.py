@@ -1,4 +1,9 @@
+import asyncio
+import concurrent.futures
+import threading
+
 import zmq
+import zmq.asyncio
 
 
 class StreamReceiver:
@@ -49,3 +54,114 @@ class StreamReceiver:
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
+
+
+class PrefetchStreamReceiver:
+    def __init__(self, host, port, decoder=None, timeout=2.5, raw=False):
+        self.host = host
+        self.port = port
+        self.decoder = decoder
+        self.timeout = timeout
+        self.raw = raw
+
+        self.context = zmq.asyncio.Context()
+        self.socket = None
+
+        self.loop = asyncio.new_event_loop()
+        self.slot = asyncio.Queue(maxsize=1)
+        self.task = None
+        self.running = True
+
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def connect(self):
+        try:
+            self.socket = self.context.socket(zmq.REQ)
+            self.socket.setsockopt(zmq.LINGER, 0)
+            self.socket.connect(f"tcp://{self.host}:{self.port}")
+        except Exception as error:
+            print(f"Failed to connect to the server: {error}")
+
+    def reset(self):
+        if self.socket:
+            self.socket.close()
+
+        self.connect()
+
+    async def request_data(self):
+        try:
+            await self.socket.send_string("get_data")
+
+            if await self.socket.poll(self.timeout * 1000, zmq.POLLIN):
+                if self.raw:
+                    return await self.socket.recv()
+
+                return await self.socket.recv_json()
+        except Exception as error:
+            print(f"Failed to receive data: {error}")
+
+        print(f"No reply from {self.host}:{self.port} in {self.timeout}s, resetting socket")
+        self.reset()
+
+        return None
+
+    async def prefetch(self):
+        self.connect()
+
+        while self.running:
+            data = await self.request_data()
+            if data is None:
+                continue
+
+            if self.decoder:
+                try:
+                    data = self.decoder(data)
+                except Exception as error:
+                    print(f"Failed to decode data: {error}")
+                    continue
+
+            await self.slot.put(data)
+            await self.slot.join()
+
+    async def take(self):
+        data = await self.slot.get()
+        self.slot.task_done()
+
+        return data
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.task = self.loop.create_task(self.prefetch())
+
+        try:
+            self.loop.run_until_complete(self.task)
+        except asyncio.CancelledError:
+            pass
+
+    def get_data(self, timeout=None):
+        future = asyncio.run_coroutine_threadsafe(self.take(), self.loop)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            return None
+
+    def close(self):
+        self.running = False
+        if self.task:
+            self.loop.call_soon_threadsafe(self.task.cancel)
+        self.thread.join(timeout=self.timeout)
+
+        if self.socket:
+            self.socket.close()
+            print("Socket closed")
+        if self.context:
+            self.context.term()
+            print("ZeroMQ context terminated")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -1,11 +1,24 @@
 import base64
 import json
-from dataclasses import dataclass, asdict, field
+from dataclasses import dataclass, field
 from typing import List
 
 import numpy
 import cv2
 
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+REDUCED_COLOR_MODES = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8
+}
+
 
 @dataclass
 class RangefinderData:
@@ -19,34 +32,42 @@ class RangefinderData:
     data_type: str
     frame: numpy.ndarray = field(repr=False)
 
-    def encode_frame(self):
+    def encode_frame(self, binary=False):
         _, buffer = cv2.imencode(".png", self.frame, [cv2.IMWRITE_PNG_COMPRESSION, 0])
+
+        if binary:
+            return buffer.tobytes()
+
         encoded_frame = base64.b64encode(buffer).decode("utf-8")
 
         return encoded_frame
 
     def decode_frame(self, frame):
-        image_decoded = base64.b64decode(frame)
+        image_decoded = frame if isinstance(frame, bytes) else base64.b64decode(frame)
 
-        if self.data_type == "uint8":
-            data_type = numpy.uint8
-        elif self.data_type == "uint16":
-            data_type = numpy.uint16
-        else:
+        if self.data_type not in ("uint8", "uint16"):
             raise ValueError("Unsupported data type specified")
 
-        frame_array = numpy.frombuffer(image_decoded, dtype=data_type)
+        frame_array = numpy.frombuffer(image_decoded, dtype=numpy.uint8)
         decoded_frame = cv2.imdecode(frame_array, cv2.IMREAD_UNCHANGED)
 
         return decoded_frame
 
-    def to_json(self):
-        data = asdict(self)
-        data.pop("frame")
-
-        data["frame"] = self.encode_frame()
+    def to_dict(self, binary=False):
+        return {
+            "timestamp": self.timestamp,
+            "width": self.width,
+            "height": self.height,
+            "fps": self.fps,
+            "fov": self.fov,
+            "min_range": self.min_range,
+            "max_range": self.max_range,
+            "data_type": self.data_type,
+            "frame": self.encode_frame(binary)
+        }
 
-        return json.dumps(data)
+    def to_json(self):
+        return json.dumps(self.to_dict())
 
     @classmethod
     def from_dict(cls, data):
@@ -66,41 +87,51 @@ class CameraData:
     fov: float
     data_type: str
     frame: numpy.ndarray = field(repr=False)
+    sequence: int = field(default=None, repr=False)
 
-    def encode_frame(self):
+    def encode_frame(self, binary=False):
         _, buffer = cv2.imencode(".jpg", self.frame, [int(cv2.IMWRITE_JPEG_QUALITY), 90])
+
+        if binary:
+            return buffer.tobytes()
+
         encoded_frame = base64.b64encode(buffer).decode("utf-8")
 
         return encoded_frame
 
-    def decode_frame(self, frame):
-        image_decoded = base64.b64decode(frame)
+    def decode_frame(self, frame, scale=1):
+        image_decoded = frame if isinstance(frame, bytes) else base64.b64decode(frame)
 
-        if self.data_type == "uint8":
-            data_type = numpy.uint8
-        elif self.data_type == "uint16":
-            data_type = numpy.uint16
-        else:
+        if self.data_type not in ("uint8", "uint16"):
             raise ValueError("Unsupported data type specified")
 
-        frame_array = numpy.frombuffer(image_decoded, dtype=data_type)
-        decoded_frame = cv2.imdecode(frame_array, cv2.IMREAD_COLOR)
+        if scale not in REDUCED_COLOR_MODES:
+            raise ValueError(f"Unsupported decode scale {scale}, choose from {list(REDUCED_COLOR_MODES.keys())}")
 
-        return decoded_frame
+        frame_array = numpy.frombuffer(image_decoded, dtype=numpy.uint8)
+        decoded_frame = cv2.imdecode(frame_array, REDUCED_COLOR_MODES[scale])
 
-    def to_json(self):
-        data = asdict(self)
-        data.pop("frame")
+        return decoded_frame
 
-        data["frame"] = self.encode_frame()
+    def to_dict(self, binary=False):
+        return {
+            "timestamp": self.timestamp,
+            "width": self.width,
+            "height": self.height,
+            "fps": self.fps,
+            "fov": self.fov,
+            "data_type": self.data_type,
+            "frame": self.encode_frame(binary)
+        }
 
-        return json.dumps(data)
+    def to_json(self):
+        return json.dumps(self.to_dict())
 
     @classmethod
-    def from_dict(cls, data):
+    def from_dict(cls, data, scale=1):
         encoded_frame = data.pop("frame")
         instance = cls(frame=numpy.array([]), **data)
-        instance.frame = instance.decode_frame(encoded_frame)
+        instance.frame = instance.decode_frame(encoded_frame, scale)
 
         return instance
 
@@ -125,8 +156,18 @@ class FDMData:
             position_xyz=[gps_position[0], -gps_position[1], -gps_position[2]]
         )
 
+    def to_dict(self):
+        return {
+            "timestamp": self.timestamp,
+            "imu_angular_velocity_rpy": self.imu_angular_velocity_rpy,
+            "imu_linear_acceleration_xyz": self.imu_linear_acceleration_xyz,
+            "imu_orientation_rpy": self.imu_orientation_rpy,
+            "velocity_xyz": self.velocity_xyz,
+            "position_xyz": self.position_xyz
+        }
+
     def to_json(self):
-        return json.dumps(asdict(self))
+        return json.dumps(self.to_dict())
 
     @classmethod
     def from_dict(cls, data):
@@ -140,8 +181,16 @@ class GimbalAxisData:
     current: float
     target: float
 
+    def to_dict(self):
+        return {
+            "min": self.min,
+            "max": self.max,
+            "current": self.current,
+            "target": self.target
+        }
+
     def to_json(self):
-        return json.dumps(asdict(self))
+        return json.dumps(self.to_dict())
 
     @classmethod
     def from_dict(cls, data):
@@ -155,11 +204,16 @@ class GimbalData:
     pitch: GimbalAxisData
     yaw: GimbalAxisData
 
+    def to_dict(self):
+        return {
+            "timestamp": self.timestamp,
+            "roll": self.roll.to_dict(),
+            "pitch": self.pitch.to_dict(),
+            "yaw": self.yaw.to_dict()
+        }
+
     def to_json(self):
-        return json.dumps({"timestamp": self.timestamp,
-                           "roll": json.loads(self.roll.to_json()),
-                           "pitch": json.loads(self.pitch.to_json()),
-                           "yaw": json.loads(self.yaw.to_json())})
+        return json.dumps(self.to_dict())
 
     @classmethod
     def from_dict(cls, data):
@@ -180,23 +234,60 @@ class DroneData:
     depth: RangefinderData
     rangefinder: RangefinderData
 
+    def to_dict(self, binary=False):
+        return {
+            "timestamp": self.timestamp,
+            "fdm": self.fdm.to_dict(),
+            "gimbal": self.gimbal.to_dict(),
+            "camera": self.camera.to_dict(binary),
+            "depth": self.depth.to_dict(binary),
+            "rangefinder": self.rangefinder.to_dict(binary)
+        }
+
     def to_json(self):
-        return json.dumps({"timestamp": self.timestamp,
-                           "fdm": json.loads(self.fdm.to_json()),
-                           "gimbal": json.loads(self.gimbal.to_json()),
-                           "camera": json.loads(self.camera.to_json()),
-                           "depth": json.loads(self.depth.to_json()),
-                           "rangefinder": json.loads(self.rangefinder.to_json())})
+        return json.dumps(self.to_dict())
 
-    @classmethod
-    def from_json(cls, data):
-        data = json.loads(data)
+    def to_msgpack(self):
+        if msgpack is None:
+            raise ImportError("msgpack is required for the msgpack backend, install it with 'poetry install -E msgpack' or 'pip install msgpack'")
 
+        return msgpack.packb(self.to_dict(binary=True), use_bin_type=True)
+
+    def encode(self, backend="json"):
+        if backend == "json":
+            return self.to_json()
+        elif backend == "msgpack":
+            return self.to_msgpack()
+        else:
+            raise ValueError(f"Unsupported serialization backend: {backend}")
+
+    @classmethod
+    def from_dict(cls, data, frame_scale=1):
         return cls(
             timestamp=data["timestamp"],
             fdm=FDMData.from_dict(data["fdm"]),
             gimbal=GimbalData.from_dict(data["gimbal"]),
-            camera=CameraData.from_dict(data["camera"]),
+            camera=CameraData.from_dict(data["camera"], frame_scale),
             depth=RangefinderData.from_dict(data["depth"]),
             rangefinder=RangefinderData.from_dict(data["rangefinder"])
-        )
\ No newline at end of file
+        )
+
+    @classmethod
+    def from_json(cls, data, frame_scale=1):
+        return cls.from_dict(json.loads(data), frame_scale)
+
+    @classmethod
+    def from_msgpack(cls, data, frame_scale=1):
+        if msgpack is None:
+            raise ImportError("msgpack is required for the msgpack backend, install it with 'poetry install -E msgpack' or 'pip install msgpack'")
+
+        return cls.from_dict(msgpack.unpackb(data, raw=False), frame_scale)
+
+    @classmethod
+    def decode(cls, data, backend="json", frame_scale=1):
+        if backend == "json":
+            return cls.from_json(data, frame_scale)
+        elif backend == "msgpack":
+            return cls.from_msgpack(data, frame_scale)
+        else:
+            raise ValueError(f"Unsupported serialization backend: {backend}")
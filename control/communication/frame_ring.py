@@ -0,0 +1,138 @@
+from multiprocessing import shared_memory
+
+import numpy
+
+
+SLOT_HEADER = numpy.dtype([
+    ("sequence", numpy.int64),
+    ("timestamp", numpy.float64),
+    ("height", numpy.int32),
+    ("width", numpy.int32),
+    ("channels", numpy.int32),
+    ("reserved", numpy.int32)
+])
+
+RING_HEADER = numpy.dtype([
+    ("head", numpy.int64),
+    ("slots", numpy.int64),
+    ("slot_size", numpy.int64)
+])
+
+
+class FrameRing:
+    def __init__(self, name=None, slots=4, max_shape=(1080, 1920, 3), dtype=numpy.uint8, create=True):
+        self.dtype = numpy.dtype(dtype)
+
+        if create:
+            slot_size = int(numpy.prod(max_shape)) * self.dtype.itemsize
+            total_size = RING_HEADER.itemsize + slots * (SLOT_HEADER.itemsize + slot_size)
+
+            self.memory = shared_memory.SharedMemory(name=name, create=True, size=total_size)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+
+        self.owner = create
+
+        self.ring_header = numpy.ndarray((1,), dtype=RING_HEADER, buffer=self.memory.buf)[0]
+        if create:
+            self.ring_header["head"] = -1
+            self.ring_header["slots"] = slots
+            self.ring_header["slot_size"] = slot_size
+
+        self.slots = int(self.ring_header["slots"])
+        self.slot_size = int(self.ring_header["slot_size"])
+
+        self.headers = numpy.ndarray(
+            (self.slots,),
+            dtype=SLOT_HEADER,
+            buffer=self.memory.buf,
+            offset=RING_HEADER.itemsize
+        )
+        self.frames = numpy.ndarray(
+            (self.slots, self.slot_size),
+            dtype=numpy.uint8,
+            buffer=self.memory.buf,
+            offset=RING_HEADER.itemsize + self.slots * SLOT_HEADER.itemsize
+        )
+
+        if create:
+            self.headers["sequence"] = -1
+
+    @property
+    def name(self):
+        return self.memory.name
+
+    @property
+    def head(self):
+        return int(self.ring_header["head"])
+
+    def write(self, frame, timestamp):
+        if frame.nbytes > self.slot_size:
+            raise ValueError(f"Frame of {frame.nbytes} bytes does not fit into {self.slot_size} byte slot")
+
+        sequence = self.head + 1
+        slot = sequence % self.slots
+        header = self.headers[slot]
+
+        header["sequence"] = -1
+
+        height, width = frame.shape[:2]
+        channels = frame.shape[2] if frame.ndim == 3 else 1
+        view = self.frames[slot, :frame.nbytes].view(self.dtype).reshape(frame.shape)
+        numpy.copyto(view, frame, casting="unsafe")
+
+        header["timestamp"] = timestamp
+        header["height"] = height
+        header["width"] = width
+        header["channels"] = channels
+        header["sequence"] = sequence
+
+        self.ring_header["head"] = sequence
+
+        return sequence
+
+    def get(self, sequence):
+        if sequence < 0 or sequence <= self.head - self.slots:
+            return None
+
+        header = self.headers[sequence % self.slots]
+        if header["sequence"] != sequence:
+            return None
+
+        height, width, channels = int(header["height"]), int(header["width"]), int(header["channels"])
+        shape = (height, width, channels) if channels > 1 else (height, width)
+        size = height * width * channels * self.dtype.itemsize
+
+        return self.frames[sequence % self.slots, :size].view(self.dtype).reshape(shape)
+
+    def get_timestamp(self, sequence):
+        header = self.headers[sequence % self.slots]
+        if header["sequence"] != sequence:
+            return None
+
+        return float(header["timestamp"])
+
+    def latest(self):
+        sequence = self.head
+        frame = self.get(sequence)
+
+        if frame is None:
+            return None
+
+        return sequence, self.get_timestamp(sequence), frame
+
+    def is_valid(self, sequence):
+        return self.headers[sequence % self.slots]["sequence"] == sequence
+
+    def close(self):
+        del self.ring_header, self.headers, self.frames
+        self.memory.close()
+
+        if self.owner:
+            self.memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
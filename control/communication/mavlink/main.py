@@ -1,7 +1,7 @@
 import math
 import time
 from mavlink import MAVLinkController, DataAcquisitionThread
-from mavlink.data import QueuePipe, Attitude, GlobalPosition, LocalPosition
+from mavlink.data import Attitude, GlobalPosition, LocalPosition
 from mavlink.processor import DataProcessor, GimbalProcessor, GlobalPositionProcessor, AttitudeProcessor
 from pymavlink import mavutil
 from mavlink.data import MAVLinkDataType, Gimbal, RCChannels, ServoChannels
@@ -16,7 +16,7 @@ acquisition_thread = DataAcquisitionThread(mavlink_connection, [attitude_process
 acquisition_thread.start()
 
 for i in range(0, 90, 10):
-    latest_data = gimbal_processor.queue.get_latest()
+    latest_data = gimbal_processor.get_data()
     if latest_data:
         print("GIMBAL", [math.degrees(axis) for axis in latest_data.quaternion.to_euler()])
 
@@ -1,20 +1,32 @@
 import time
 import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from enum import Enum
 from .data import Quaternion
+from .recorder import TelemetryRecorder
+from .router import MAVLinkRouter
 
 from pymavlink import mavutil
 
 
 class MAVLinkController:
-    def __init__(self, device):
-        self.lock = threading.Lock()
+    def __init__(self, device, receive_timeout=1.0, heartbeat_timeout=5.0):
+        self.send_lock = threading.Lock()
+        self.receive_lock = threading.Lock()
+        self.receive_timeout = receive_timeout
+        self.heartbeat_timeout = heartbeat_timeout
         self.boot_time = None
+        self.command_scheduler = None
+        self.recorder = None
+        self.router = None
         self.connection = self.create_connection(device)
         self.gimbal = GimbalController(self)
 
     def create_connection(self, url):
         self.connection = mavutil.mavlink_connection(url)
-        self.connection.wait_heartbeat()
+        while self.connection.wait_heartbeat(timeout=self.heartbeat_timeout) is None:
+            print(f"No heartbeat from {url} after {self.heartbeat_timeout}s, still waiting")
         self.boot_time = time.time()
 
         return self.connection
@@ -64,22 +76,108 @@ class MAVLinkController:
 
         self.send_packet(composed_control)
 
+    def set_message_interval(self, message_type, rate):
+        if isinstance(message_type, Enum):
+            message_type = message_type.value
+
+        message_id = getattr(mavutil.mavlink, f"MAVLINK_MSG_ID_{message_type}", None)
+        if message_id is None:
+            print(f"Message {message_type} is not defined in the current MAVLink dialect")
+            return
+
+        interval = int(1e6 / rate) if rate > 0 else -1
+
+        command = self.encode_command_long(
+            mavutil.mavlink.MAV_CMD_SET_MESSAGE_INTERVAL,
+            0,
+            message_id, interval,
+            0, 0, 0, 0, 0
+        )
+
+        self.send_packet(command)
+
+    def stop_data_streams(self):
+        message = self.connection.mav.request_data_stream_encode(
+            self.connection.target_system,
+            self.connection.target_component,
+            mavutil.mavlink.MAV_DATA_STREAM_ALL,
+            0,
+            0
+        )
+
+        self.send_packet(message)
+
+    def negotiate_message_rates(self, message_rates, stop_unused=True):
+        if stop_unused:
+            self.stop_data_streams()
+
+        for message_type, rate in message_rates.items():
+            self.set_message_interval(message_type, rate)
+
     def send_packet(self, message):
-        with self.lock:
+        with self.send_lock:
             self.connection.mav.send(message)
 
+    def send_raw(self, buffer):
+        with self.send_lock:
+            self.connection.write(buffer)
+
+    def start_router(self, endpoints):
+        self.router = MAVLinkRouter(self, endpoints)
+        self.connection.message_hooks.append(self.router.forward)
+        self.router.start()
+
+        return self.router
+
+    def stop_router(self):
+        router, self.router = self.router, None
+
+        if router is not None:
+            self.connection.message_hooks.remove(router.forward)
+            router.stop()
+
+    def send_command(self, message, coalesce_key=None):
+        if self.command_scheduler is None:
+            self.send_packet(message)
+            return None
+
+        return self.command_scheduler.submit(message, coalesce_key)
+
     def receive_packet(self, packet_type):
-        with self.lock:
-            message = self.connection.recv_match(type=packet_type, blocking=True)
+        packet_types = {packet_type} if isinstance(packet_type, str) else set(packet_type)
 
-            return message
+        with self.receive_lock:
+            while True:
+                message = self.connection.recv_match(blocking=True)
+                if message is None:
+                    return None
+
+                if self.recorder is not None:
+                    self.recorder.write(message)
+
+                if message.get_type() in packet_types:
+                    return message
 
     def receive_data(self):
-        with self.lock:
-            message = self.connection.recv_match(blocking=True)
+        with self.receive_lock:
+            message = self.connection.recv_match(blocking=True, timeout=self.receive_timeout)
+
+            if message is not None and self.recorder is not None:
+                self.recorder.write(message)
 
             return message
 
+    def start_recording(self, path):
+        self.recorder = TelemetryRecorder(path)
+
+        return self.recorder
+
+    def stop_recording(self):
+        recorder, self.recorder = self.recorder, None
+
+        if recorder is not None:
+            recorder.close()
+
 
 class GimbalController:
     def __init__(self, mavlink_controller: MAVLinkController):
@@ -94,7 +192,7 @@ class GimbalController:
             mavutil.mavlink.MAV_MOUNT_MODE_MAVLINK_TARGETING
         )
 
-        self.mavlink_controller.send_packet(command)
+        return self.mavlink_controller.send_command(command, coalesce_key="gimbal")
 
     def set_roi_location(self, latitude, longitude, altitude):
         latitude_int = int(latitude * 10 ** 7)
@@ -107,7 +205,7 @@ class GimbalController:
             latitude_int, longitude_int, altitude
         )
 
-        self.mavlink_controller.send_packet(command)
+        return self.mavlink_controller.send_command(command, coalesce_key="gimbal")
 
     def disable_roi(self):
         command = self.mavlink_controller.encode_command_int(
@@ -117,25 +215,169 @@ class GimbalController:
             0, 0, 0
         )
 
-        self.mavlink_controller.send_packet(command)
+        return self.mavlink_controller.send_command(command, coalesce_key="gimbal")
+
+
+class CommandScheduler(threading.Thread):
+    def __init__(self, mavlink_controller: MAVLinkController, send_interval=0.1, timeout=1.0, retries=3):
+        super().__init__(daemon=True)
+        self.mavlink_controller = mavlink_controller
+        self.send_interval = send_interval
+        self.timeout = timeout
+        self.retries = retries
+
+        self.pending = OrderedDict()
+        self.in_flight = {}
+        self.lock = threading.Lock()
+        self.running = False
+
+        self.mavlink_controller.command_scheduler = self
+
+    def submit(self, message, coalesce_key=None):
+        future = Future()
+        key = coalesce_key if coalesce_key is not None else message.command
+
+        with self.lock:
+            previous = self.pending.pop(key, None)
+            self.pending[key] = (message, future)
+
+        if previous is not None:
+            previous[1].cancel()
+
+        return future
+
+    def add_data(self, packet):
+        if packet.result == mavutil.mavlink.MAV_RESULT_IN_PROGRESS:
+            return
+
+        with self.lock:
+            entry = self.in_flight.pop(packet.command, None)
+
+        if entry is not None:
+            entry["future"].set_result(packet.result)
+
+    def _expire(self, now):
+        failed = []
+        for command, entry in list(self.in_flight.items()):
+            if now < entry["deadline"]:
+                continue
+
+            if entry["attempts"] >= self.retries:
+                del self.in_flight[command]
+                failed.append(entry)
+                continue
+
+            message = entry["message"]
+            if hasattr(message, "confirmation"):
+                message.confirmation = min(message.confirmation + 1, 255)
+
+            self.mavlink_controller.send_packet(message)
+            entry["attempts"] += 1
+            entry["deadline"] = now + self.timeout
+
+        return failed
+
+    def _dispatch(self, now):
+        for key, (message, future) in list(self.pending.items()):
+            if message.command in self.in_flight:
+                continue
+
+            del self.pending[key]
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            self.mavlink_controller.send_packet(message)
+            self.in_flight[message.command] = {
+                "message": message,
+                "future": future,
+                "attempts": 1,
+                "deadline": now + self.timeout
+            }
+
+    def run(self):
+        self.running = True
+        while self.running:
+            with self.lock:
+                now = time.monotonic()
+                failed = self._expire(now)
+                self._dispatch(now)
+
+            for entry in failed:
+                entry["future"].set_exception(
+                    TimeoutError(f"Command {entry['message'].command} was not acknowledged after {self.retries} attempts")
+                )
+
+            time.sleep(self.send_interval)
+
+    def stop(self):
+        self.running = False
 
 
 class DataAcquisitionThread(threading.Thread):
-    def __init__(self, mavlink_handler, processor_list, delay=1/100):
-        super().__init__()
+    WILDCARD = "*"
+
+    def __init__(self, mavlink_handler, processor_list):
+        super().__init__(daemon=True)
         self.mavlink_handler = mavlink_handler
-        self.processor_list = processor_list
-        self.delay = delay
+        self.processor_list = []
+        self.running = False
+
+        self.subscriptions = {}
+        self.dispatch_table = ({}, ())
+
+        for processor in processor_list:
+            self.subscribe(processor)
+
+    def _rebuild_dispatch_table(self):
+        wildcard = tuple(self.subscriptions.get(self.WILDCARD, ()))
+        table = {
+            message_type: tuple(processors) + wildcard
+            for message_type, processors in self.subscriptions.items()
+            if message_type != self.WILDCARD
+        }
+
+        self.dispatch_table = (table, wildcard)
+
+    def subscribe(self, processor, message_type=None):
+        if message_type is None:
+            message_type = processor.data_type
+        if isinstance(message_type, Enum):
+            message_type = message_type.value
+
+        self.subscriptions.setdefault(message_type, []).append(processor)
+        if processor not in self.processor_list:
+            self.processor_list.append(processor)
+
+        self._rebuild_dispatch_table()
+
+    def unsubscribe(self, processor):
+        for processors in self.subscriptions.values():
+            if processor in processors:
+                processors.remove(processor)
+
+        self.subscriptions = {key: value for key, value in self.subscriptions.items() if value}
+        self.processor_list = [item for item in self.processor_list if item is not processor]
+
+        self._rebuild_dispatch_table()
+
+    def message_types(self):
+        return [message_type for message_type in self.subscriptions if message_type != self.WILDCARD]
 
     def find_interested(self, packet):
-        for processor in self.processor_list:
-            if packet.msgname == processor.data_type.value:
-                processor.add_data(packet)
+        table, wildcard = self.dispatch_table
+
+        for processor in table.get(packet.msgname, wildcard):
+            processor.add_data(packet)
 
     def run(self):
-        while True:
+        self.running = True
+        while self.running:
             packet = self.mavlink_handler.receive_data()
 
+            if packet is None:
+                continue
+
             self.find_interested(packet)
 
-            time.sleep(self.delay)
+    def stop(self):
+        self.running = False
@@ -1,8 +1,10 @@
-import re
+import bisect
 from abc import ABC, abstractmethod
 from enum import Enum
 from typing import Any, Type
 
+import numpy
+
 
 class ControlChannel(ABC):
     def __init__(self, id: int, name: str, value: int):
@@ -23,15 +25,12 @@ class Axis(ControlChannel, ABC):
     def __init__(self, channel_id: int, name: str, value: int, value_range: Type[Enum]):
         super().__init__(channel_id, name, 0)
         self.value_range = value_range
+        self.minimum = value_range.MIN.value
+        self.maximum = value_range.MAX.value
         self.update_value(value)
 
     def update_value(self, raw_value: int) -> None:
-        if self.value_range.MIN.value <= raw_value <= self.value_range.MAX.value:
-            self.value = int(raw_value)
-        else:
-            closest_value = min(self.value_range, key=lambda x: abs(x.value - raw_value))
-
-            self.value = int(closest_value.value)
+        self.value = int(min(max(raw_value, self.minimum), self.maximum))
 
     def get_value(self) -> int:
         return self.value
@@ -41,12 +40,14 @@ class Switch(ControlChannel, ABC):
     def __init__(self, channel_id: int, name: str, value: int, value_range: Type[Enum]):
         super().__init__(channel_id, name, 0)
         self.value_range = value_range
+        self.positions = sorted(value_range, key=lambda x: x.value)
+        self.thresholds = [
+            (lower.value + upper.value) / 2 for lower, upper in zip(self.positions, self.positions[1:])
+        ]
         self.update_value(value)
 
     def update_value(self, raw_value: float) -> None:
-        closest_value = min(self.value_range, key=lambda x: abs(x.value - raw_value))
-
-        self.value = closest_value
+        self.value = self.positions[bisect.bisect_left(self.thresholds, raw_value)]
 
     def get_value(self) -> Type[Enum]:
         return self.value
@@ -78,16 +79,48 @@ class ChannelProcessor:
             else:
                 raise ValueError(f"Invalid channel type: {type(channel)}")
 
+        self.attributes = {f"chan{channel_id}_raw": channel for channel_id, channel in self.channels.items()}
+
     def update_channel(self, key, value):
         if key in self.channels:
             self.channels[key].update_value(value)
 
     def add_data(self, mavlink_message):
-        pattern = r'chan(\d+)_raw'
+        for attribute, channel in self.attributes.items():
+            value = getattr(mavlink_message, attribute, None)
+            if value is not None:
+                channel.update_value(value)
+
+
+class ChannelMap:
+    def __init__(self, *watch_channel):
+        axes = [channel for channel in watch_channel if isinstance(channel, Axis)]
+        switches = [channel for channel in watch_channel if isinstance(channel, Switch)]
+
+        if len(axes) + len(switches) != len(watch_channel):
+            raise ValueError("Only Axis and Switch channels can be mapped")
+
+        self.axes = axes
+        self.axis_index = numpy.array([channel.id - 1 for channel in axes], dtype=numpy.intp)
+        self.axis_minimum = numpy.array([channel.minimum for channel in axes], dtype=numpy.float64)
+        self.axis_maximum = numpy.array([channel.maximum for channel in axes], dtype=numpy.float64)
+
+        self.switches = switches
+        self.switch_index = numpy.array([channel.id - 1 for channel in switches], dtype=numpy.intp)
+
+        width = max((len(channel.positions) for channel in switches), default=0)
+        self.switch_levels = numpy.full((len(switches), width), numpy.inf)
+        for row, channel in enumerate(switches):
+            self.switch_levels[row, :len(channel.positions)] = [position.value for position in channel.positions]
+
+    def clamp_axes(self, raw_values):
+        return numpy.clip(raw_values[self.axis_index], self.axis_minimum, self.axis_maximum)
+
+    def quantise_switches(self, raw_values):
+        if len(self.switches) == 0:
+            return numpy.zeros(0, dtype=numpy.intp)
 
-        message_dict = mavlink_message.__dict__
+        return numpy.abs(raw_values[self.switch_index, None] - self.switch_levels).argmin(axis=1)
 
-        for key, value in message_dict.items():
-            if re.match(pattern, key):
-                key_id = int(re.match(pattern, key).group(1))
-                self.update_channel(key_id, value)
+    def switch_positions(self, positions):
+        return [channel.positions[index] for channel, index in zip(self.switches, positions)]
@@ -18,6 +18,12 @@ class MAVLinkDataType(Enum):
     SERVO = "SERVO_OUTPUT_RAW"
 
 
+def packet_timestamp(packet):
+    timestamp = getattr(packet, "_timestamp", None)
+
+    return timestamp if timestamp else time.time()
+
+
 class QueuePipe:
     def __init__(self, max_size=100):
         self._queue = deque(maxlen=max_size)
@@ -45,6 +51,148 @@ class QueuePipe:
                 return None
 
 
+class TimeSeriesBuffer:
+    def __init__(self, fields, max_size=100, periods=None):
+        self.fields = tuple(fields)
+        self.columns = {name: index + 1 for index, name in enumerate(self.fields)}
+        self.max_size = max_size
+
+        periods = periods or {}
+        self._periods = numpy.array([periods.get(name, numpy.nan) for name in self.fields])
+        self._periodic = ~numpy.isnan(self._periods)
+
+        self._data = numpy.full((len(self.fields) + 1, 2 * max_size), numpy.nan)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def size(self):
+        return min(self._count, self.max_size)
+
+    def append(self, timestamp, *values):
+        with self._lock:
+            index = self._count % self.max_size
+            row = (timestamp, *values)
+
+            self._data[:, index] = row
+            self._data[:, index + self.max_size] = row
+            self._count += 1
+
+    def last(self, size=None):
+        """Return a copy of the newest samples, one column per sample.
+
+        A view would be overwritten by later appends as soon as the caller
+        released the lock. Copying the default 100 columns takes about two
+        microseconds, far below the telemetry period.
+        """
+        with self._lock:
+            available_size = self.size() if size is None else min(size, self.size())
+            if available_size == 0:
+                return self._data[:, :0].copy()
+
+            end = (self._count - 1) % self.max_size + self.max_size + 1
+
+            return self._data[:, end - available_size:end].copy()
+
+    def timestamps(self, size=None):
+        return self.last(size)[0]
+
+    def column(self, name, size=None):
+        return self.last(size)[self.columns[name]]
+
+    def latest(self):
+        data = self.last(1)
+        if data.shape[1] == 0:
+            return None
+
+        return data[:, 0]
+
+    def index_of(self, timestamp, size=None):
+        return int(numpy.searchsorted(self.timestamps(size), timestamp, side="right")) - 1
+
+    def window(self, start_timestamp, end_timestamp):
+        data = self.last()
+        start = int(numpy.searchsorted(data[0], start_timestamp, side="left"))
+        end = int(numpy.searchsorted(data[0], end_timestamp, side="right"))
+
+        return data[:, start:end]
+
+    def interpolate(self, timestamp, size=None):
+        data = self.last(size)
+        count = data.shape[1]
+        if count == 0:
+            return None
+
+        timestamps = data[0]
+        index = int(numpy.searchsorted(timestamps, timestamp, side="right"))
+
+        if index <= 0:
+            return data[1:, 0].copy()
+        if index >= count:
+            return data[1:, -1].copy()
+
+        previous_timestamp, next_timestamp = timestamps[index - 1], timestamps[index]
+        weight = (timestamp - previous_timestamp) / (next_timestamp - previous_timestamp) if next_timestamp > previous_timestamp else 0.0
+
+        return self._blend(data[1:, index - 1], data[1:, index], weight)
+
+    def locate(self, timestamp, max_extrapolation=0.1, size=None):
+        data = self.last(size)
+        count = data.shape[1]
+        if count == 0:
+            return None
+        if count == 1:
+            return data[1:, 0], data[1:, 0], 0.0
+
+        timestamps = data[0]
+        timestamp = min(max(timestamp, timestamps[0] - max_extrapolation), timestamps[-1] + max_extrapolation)
+        index = min(max(int(numpy.searchsorted(timestamps, timestamp, side="right")), 1), count - 1)
+
+        previous_timestamp, next_timestamp = timestamps[index - 1], timestamps[index]
+        weight = (timestamp - previous_timestamp) / (next_timestamp - previous_timestamp) if next_timestamp > previous_timestamp else 0.0
+
+        return data[1:, index - 1], data[1:, index], weight
+
+    def sample(self, timestamp, max_extrapolation=0.1, size=None):
+        location = self.locate(timestamp, max_extrapolation, size)
+        if location is None:
+            return None
+
+        return self._blend(*location)
+
+    def _blend(self, previous_values, next_values, weight):
+        if not self._periodic.any():
+            return previous_values + weight * (next_values - previous_values)
+
+        periods = self._periods[self._periodic]
+
+        delta = next_values - previous_values
+        delta[self._periodic] = periods / 2 - (periods / 2 - delta[self._periodic]) % periods
+
+        values = previous_values + weight * delta
+        values[self._periodic] = periods / 2 - (periods / 2 - values[self._periodic]) % periods
+
+        return values
+
+
+def slerp(source, target, weight):
+    source = numpy.asarray(source, dtype=numpy.float64)
+    target = numpy.asarray(target, dtype=numpy.float64)
+
+    dot = numpy.dot(source, target)
+    if dot < 0:
+        target = -target
+        dot = -dot
+
+    if dot > 0.9995:
+        result = source + weight * (target - source)
+        return result / numpy.linalg.norm(result)
+
+    theta = math.acos(min(dot, 1.0))
+    sin_theta = math.sin(theta)
+
+    return (math.sin((1 - weight) * theta) * source + math.sin(weight * theta) * target) / sin_theta
+
+
 @dataclass
 class Quaternion:
     w: float
@@ -118,7 +266,7 @@ class LocalPosition:
     @classmethod
     def from_mavlink(cls, data):
         return cls(
-            timestamp=time.time(),
+            timestamp=packet_timestamp(data),
             x=data.x,
             y=data.y,
             z=data.z,
@@ -146,7 +294,7 @@ class GlobalPosition:
     @classmethod
     def from_mavlink(cls, data):
         return cls(
-            timestamp=time.time(),
+            timestamp=packet_timestamp(data),
             latitude=data.lat / 1e7,
             longitude=data.lon / 1e7,
             altitude=data.alt / 1000,
@@ -174,7 +322,7 @@ class Attitude:
     @classmethod
     def from_mavlink(cls, data):
         return cls(
-            timestamp=time.time(),
+            timestamp=packet_timestamp(data),
             roll=data.roll,
             pitch=data.pitch,
             yaw=data.yaw,
@@ -241,7 +389,7 @@ class Gimbal:
     @classmethod
     def from_mavlink(cls, data):
         return cls(
-            timestamp=time.time(),
+            timestamp=packet_timestamp(data),
             flags=data.flags,
             quaternion=Quaternion(data.q)
         )
@@ -260,7 +408,7 @@ class RCChannels:
     @classmethod
     def from_mavlink(cls, data):
         return cls(
-            timestamp=time.time(),
+            timestamp=packet_timestamp(data),
             channels_count=data.chancount,
             channels_raw=[
                 data.chan1_raw, data.chan2_raw, data.chan3_raw,
@@ -285,7 +433,7 @@ class ServoChannels:
     @classmethod
     def from_mavlink(cls, data):
         return cls(
-            timestamp=time.time(),
+            timestamp=packet_timestamp(data),
             servos_raw=[
                 data.servo1_raw, data.servo2_raw, data.servo3_raw, data.servo4_raw,
                 data.servo5_raw, data.servo6_raw, data.servo7_raw, data.servo8_raw,
@@ -0,0 +1,252 @@
+import math
+import threading
+import time
+
+import numpy
+
+from ..data import GlobalPosition, Attitude, MAVLinkDataType, packet_timestamp
+
+
+EARTH_METERS_PER_DEGREE = 111320
+
+
+class ConstantVelocityFilter:
+    def __init__(self, axes=3, process_noise=1.0, period=None):
+        self.process_noise = process_noise
+        self.period = period
+
+        self.position = numpy.zeros(axes)
+        self.velocity = numpy.zeros(axes)
+
+        self.position_variance = numpy.full(axes, 1e3)
+        self.covariance = numpy.zeros(axes)
+        self.velocity_variance = numpy.full(axes, 1e3)
+
+        self.position_initialized = False
+        self.velocity_initialized = False
+        self.timestamp = None
+
+    def wrap(self, values):
+        if self.period is None:
+            return values
+
+        return (values + self.period / 2) % self.period - self.period / 2
+
+    def propagate(self, timestamp):
+        if self.timestamp is None:
+            self.timestamp = timestamp
+            return
+
+        time_delta = timestamp - self.timestamp
+        if time_delta <= 0:
+            return
+
+        noise = self.process_noise
+        self.position = self.wrap(self.position + self.velocity * time_delta)
+        self.position_variance += (
+            2 * time_delta * self.covariance +
+            time_delta ** 2 * self.velocity_variance +
+            noise * time_delta ** 4 / 4
+        )
+        self.covariance += time_delta * self.velocity_variance + noise * time_delta ** 3 / 2
+        self.velocity_variance += noise * time_delta ** 2
+
+        self.timestamp = timestamp
+
+    def update(self, timestamp, position, velocity, measurement_noise):
+        position = numpy.asarray(position, dtype=numpy.float64)
+        velocity = numpy.asarray(velocity, dtype=numpy.float64)
+
+        if not self.position_initialized or not self.velocity_initialized:
+            if not self.position_initialized:
+                self.position, self.position_variance[:] = position, measurement_noise
+            if not self.velocity_initialized:
+                self.velocity, self.velocity_variance[:] = velocity, measurement_noise
+            self.position_initialized = self.velocity_initialized = True
+            self.timestamp = timestamp
+            return
+
+        self.propagate(timestamp)
+
+        a, b, c = self.position_variance, self.covariance, self.velocity_variance
+        determinant = (a + measurement_noise) * (c + measurement_noise) - b * b
+
+        gain_position = (a * (c + measurement_noise) - b * b) / determinant
+        gain_cross = b * measurement_noise / determinant
+        gain_velocity = (c * (a + measurement_noise) - b * b) / determinant
+
+        position_innovation = self.wrap(position - self.position)
+        velocity_innovation = velocity - self.velocity
+
+        self.position = self.wrap(self.position + gain_position * position_innovation + gain_cross * velocity_innovation)
+        self.velocity = self.velocity + gain_cross * position_innovation + gain_velocity * velocity_innovation
+
+        self.position_variance = (1 - gain_position) * a - gain_cross * b
+        self.covariance = (1 - gain_position) * b - gain_cross * c
+        self.velocity_variance = (1 - gain_velocity) * c - gain_cross * b
+
+    def update_velocity(self, timestamp, velocity, measurement_noise):
+        velocity = numpy.asarray(velocity, dtype=numpy.float64)
+
+        if not self.velocity_initialized:
+            self.velocity, self.velocity_variance[:] = velocity, measurement_noise
+            self.velocity_initialized = True
+            self.timestamp = self.timestamp or timestamp
+            return
+
+        self.propagate(timestamp)
+
+        b, c = self.covariance, self.velocity_variance
+        innovation_variance = c + measurement_noise
+
+        gain_position = b / innovation_variance
+        gain_velocity = c / innovation_variance
+
+        innovation = velocity - self.velocity
+
+        self.position = self.wrap(self.position + gain_position * innovation)
+        self.velocity = self.velocity + gain_velocity * innovation
+
+        self.position_variance = self.position_variance - gain_position * b
+        self.covariance = b - gain_position * c
+        self.velocity_variance = c - gain_velocity * c
+
+    def predict(self, timestamp):
+        if self.timestamp is None:
+            return None
+
+        position = self.wrap(self.position + self.velocity * (timestamp - self.timestamp))
+
+        return position, self.velocity.copy()
+
+
+class StateEstimator:
+    def __init__(self, position_noise=2.0, attitude_noise=5.0, global_noise=1.0, local_noise=0.1, attitude_measurement_noise=1e-4):
+        self.position_filter = ConstantVelocityFilter(process_noise=position_noise)
+        self.attitude_filter = ConstantVelocityFilter(process_noise=attitude_noise, period=2 * math.pi)
+
+        self.global_noise = global_noise
+        self.local_noise = local_noise
+        self.attitude_measurement_noise = attitude_measurement_noise
+
+        self.reference = None
+        self.home_altitude = None
+
+        self.lock = threading.Lock()
+
+        self.handlers = {
+            MAVLinkDataType.GLOBAL_POSITION.value: self.add_global_position,
+            MAVLinkDataType.LOCAL_POSITION.value: self.add_local_position,
+            MAVLinkDataType.ATTITUDE.value: self.add_attitude
+        }
+
+    @property
+    def message_types(self):
+        return list(self.handlers.keys())
+
+    def to_local(self, latitude, longitude, altitude):
+        reference_latitude, reference_longitude, reference_altitude = self.reference
+
+        north = (latitude - reference_latitude) * EARTH_METERS_PER_DEGREE
+        east = (longitude - reference_longitude) * EARTH_METERS_PER_DEGREE * math.cos(math.radians(reference_latitude))
+        down = reference_altitude - altitude
+
+        return north, east, down
+
+    def to_global(self, north, east, down):
+        reference_latitude, reference_longitude, reference_altitude = self.reference
+
+        latitude = reference_latitude + north / EARTH_METERS_PER_DEGREE
+        longitude = reference_longitude + east / (EARTH_METERS_PER_DEGREE * math.cos(math.radians(reference_latitude)))
+        altitude = reference_altitude - down
+
+        return latitude, longitude, altitude
+
+    def add_data(self, packet):
+        handler = self.handlers.get(packet.msgname)
+        if handler:
+            handler(packet, packet_timestamp(packet))
+
+    def add_global_position(self, packet, timestamp):
+        latitude, longitude, altitude = packet.lat / 1e7, packet.lon / 1e7, packet.alt / 1000
+
+        with self.lock:
+            if self.reference is None:
+                self.reference = (latitude, longitude, altitude)
+            self.home_altitude = altitude - packet.relative_alt / 1000
+
+            self.position_filter.update(
+                timestamp,
+                self.to_local(latitude, longitude, altitude),
+                (packet.vx / 100, packet.vy / 100, packet.vz / 100),
+                self.global_noise
+            )
+
+    def add_local_position(self, packet, timestamp):
+        with self.lock:
+            self.position_filter.update_velocity(
+                timestamp,
+                (packet.vx, packet.vy, packet.vz),
+                self.local_noise
+            )
+
+    def add_attitude(self, packet, timestamp):
+        with self.lock:
+            self.attitude_filter.update(
+                timestamp,
+                (packet.roll, packet.pitch, packet.yaw),
+                (packet.rollspeed, packet.pitchspeed, packet.yawspeed),
+                self.attitude_measurement_noise
+            )
+
+    def predict_position(self, timestamp):
+        with self.lock:
+            if self.reference is None:
+                return None
+
+            position, velocity = self.position_filter.predict(timestamp)
+            attitude = self.attitude_filter.predict(timestamp)
+            home_altitude = self.home_altitude
+            latitude, longitude, altitude = self.to_global(*position)
+
+        if attitude is not None:
+            heading = math.degrees(attitude[0][2]) % 360
+        else:
+            heading = math.degrees(math.atan2(velocity[1], velocity[0])) % 360
+
+        return GlobalPosition(
+            timestamp=timestamp,
+            latitude=latitude,
+            longitude=longitude,
+            altitude=altitude,
+            relative_altitude=altitude - home_altitude,
+            vx=velocity[0],
+            vy=velocity[1],
+            vz=velocity[2],
+            heading=heading
+        )
+
+    def predict_attitude(self, timestamp):
+        with self.lock:
+            state = self.attitude_filter.predict(timestamp)
+
+        if state is None:
+            return None
+
+        (roll, pitch, yaw), (roll_speed, pitch_speed, yaw_speed) = state
+
+        return Attitude(
+            timestamp=timestamp,
+            roll=roll,
+            pitch=pitch,
+            yaw=yaw,
+            roll_speed=roll_speed,
+            pitch_speed=pitch_speed,
+            yaw_speed=yaw_speed
+        )
+
+    def predict(self, timestamp=None):
+        if timestamp is None:
+            timestamp = time.time()
+
+        return self.predict_position(timestamp), self.predict_attitude(timestamp)
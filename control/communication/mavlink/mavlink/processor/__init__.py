@@ -1,23 +1,30 @@
+import math
+import operator
 import time
 from abc import ABC, abstractmethod
 import numpy
 
+from ..control import ChannelMap
 from ..data import (
-    QueuePipe,
+    TimeSeriesBuffer,
     LocalPosition,
     GlobalPosition,
     Attitude,
     Gimbal,
+    Quaternion,
+    slerp,
     RCChannels,
     ServoChannels,
-    MAVLinkDataType
+    MAVLinkDataType,
+    packet_timestamp
 )
 
 
 class DataProcessor(ABC):
-    def __init__(self, queue: QueuePipe, data_type: MAVLinkDataType):
-        self.queue = queue
+    def __init__(self, data_type: MAVLinkDataType, series: TimeSeriesBuffer = None):
         self.data_type = data_type
+        self.series = series
+        self.latest = None
 
     @abstractmethod
     def add_data(self, data):
@@ -30,20 +37,46 @@ class DataProcessor(ABC):
 
 class LocalPositionProcessor(DataProcessor):
     def __init__(self):
-        super().__init__(QueuePipe(), MAVLinkDataType.LOCAL_POSITION)
+        super().__init__(
+            MAVLinkDataType.LOCAL_POSITION,
+            TimeSeriesBuffer(("x", "y", "z", "vx", "vy", "vz"))
+        )
 
     def add_data(self, data):
         format_data = LocalPosition.from_mavlink(data)
-        self.queue.add_data(format_data)
+        self.latest = format_data
+        self.series.append(
+            format_data.timestamp,
+            format_data.x, format_data.y, format_data.z,
+            format_data.vx, format_data.vy, format_data.vz
+        )
 
     def get_data(self):
-        return self.queue.get_latest()
+        return self.latest
+
+    def get_data_at(self, timestamp, max_extrapolation=0.1):
+        values = self.series.sample(timestamp, max_extrapolation)
+
+        if values is None:
+            return None
+
+        x, y, z, vx, vy, vz = values
+
+        return LocalPosition(
+            timestamp=timestamp,
+            x=x,
+            y=y,
+            z=z,
+            vx=vx,
+            vy=vy,
+            vz=vz
+        )
 
     def simple_extrapolation(self, target_timestamp=None):
         if not target_timestamp:
             target_timestamp = time.time()
 
-        position = self.queue.get_latest()
+        position = self.latest
 
         if position is None:
             return None
@@ -63,25 +96,13 @@ class LocalPositionProcessor(DataProcessor):
 
         return local_position
 
-    def extrapolate(self, target_timestamp, elements=100):
-        current_data = self.queue.get_data(size=elements)
+    def extrapolate(self, target_timestamp, elements=100, max_extrapolation=1.0):
+        values = self.series.sample(target_timestamp, max_extrapolation, size=elements)
 
-        if current_data is None or len(current_data) < 1:
+        if values is None:
             return None
 
-        timestamps = []
-        x_values = []
-        y_values = []
-        z_values = []
-        for position in current_data:
-            timestamps.append(position.timestamp)
-            x_values.append(position.x)
-            y_values.append(position.y)
-            z_values.append(position.z)
-
-        x = numpy.interp(target_timestamp, timestamps, x_values)
-        y = numpy.interp(target_timestamp, timestamps, y_values)
-        z = numpy.interp(target_timestamp, timestamps, z_values)
+        x, y, z = values[:3]
 
         current_position = LocalPosition(
             timestamp=target_timestamp,
@@ -95,32 +116,94 @@ class LocalPositionProcessor(DataProcessor):
 
 class GlobalPositionProcessor(DataProcessor):
     def __init__(self):
-        super().__init__(QueuePipe(), MAVLinkDataType.GLOBAL_POSITION)
+        super().__init__(
+            MAVLinkDataType.GLOBAL_POSITION,
+            TimeSeriesBuffer(
+                ("latitude", "longitude", "altitude", "relative_altitude", "vx", "vy", "vz", "heading"),
+                periods={"heading": 360}
+            )
+        )
 
     def add_data(self, data):
         format_data = GlobalPosition.from_mavlink(data)
-        self.queue.add_data(format_data)
+        self.latest = format_data
+        self.series.append(
+            format_data.timestamp,
+            format_data.latitude, format_data.longitude,
+            format_data.altitude, format_data.relative_altitude,
+            format_data.vx, format_data.vy, format_data.vz,
+            format_data.heading
+        )
 
     def get_data(self):
-        return self.queue.get_latest()
+        return self.latest
+
+    def get_data_at(self, timestamp, max_extrapolation=0.1):
+        values = self.series.sample(timestamp, max_extrapolation)
+
+        if values is None:
+            return None
+
+        latitude, longitude, altitude, relative_altitude, vx, vy, vz, heading = values
+
+        return GlobalPosition(
+            timestamp=timestamp,
+            latitude=latitude,
+            longitude=longitude,
+            altitude=altitude,
+            relative_altitude=relative_altitude,
+            vx=vx,
+            vy=vy,
+            vz=vz,
+            heading=heading % 360
+        )
 
 
 class AttitudeProcessor(DataProcessor):
     def __init__(self):
-        super().__init__(QueuePipe(), MAVLinkDataType.ATTITUDE)
+        super().__init__(
+            MAVLinkDataType.ATTITUDE,
+            TimeSeriesBuffer(
+                ("roll", "pitch", "yaw", "roll_speed", "pitch_speed", "yaw_speed"),
+                periods={"roll": 2 * math.pi, "pitch": 2 * math.pi, "yaw": 2 * math.pi}
+            )
+        )
 
     def add_data(self, data):
         format_data = Attitude.from_mavlink(data)
-        self.queue.add_data(format_data)
+        self.latest = format_data
+        self.series.append(
+            format_data.timestamp,
+            format_data.roll, format_data.pitch, format_data.yaw,
+            format_data.roll_speed, format_data.pitch_speed, format_data.yaw_speed
+        )
 
     def get_data(self):
-        return self.queue.get_latest()
+        return self.latest
+
+    def get_data_at(self, timestamp, max_extrapolation=0.1):
+        values = self.series.sample(timestamp, max_extrapolation)
+
+        if values is None:
+            return None
+
+        roll, pitch, yaw, roll_speed, pitch_speed, yaw_speed = values
+
+        return Attitude(
+            timestamp=timestamp,
+            roll=roll,
+            pitch=pitch,
+            yaw=yaw,
+            roll_speed=roll_speed,
+            pitch_speed=pitch_speed,
+            yaw_speed=yaw_speed
+        )
 
     def simple_extrapolation(self, target_timestamp=None):
         if not target_timestamp:
             target_timestamp = time.time()
 
-        attitude = self.queue.get_latest()
+        attitude = self.latest
 
         if attitude is None:
             return None
@@ -140,25 +223,13 @@ class AttitudeProcessor(DataProcessor):
 
         return current_attitude
 
-    def extrapolate(self, target_timestamp, elements=100):
-        current_data = self.queue.get_data(size=elements)
+    def extrapolate(self, target_timestamp, elements=100, max_extrapolation=1.0):
+        values = self.series.sample(target_timestamp, max_extrapolation, size=elements)
 
-        if current_data is None or len(current_data) < 1:
+        if values is None:
             return None
 
-        timestamps = []
-        roll_values = []
-        pitch_values = []
-        yaw_values = []
-        for attitude in current_data:
-            timestamps.append(attitude.timestamp)
-            roll_values.append(attitude.roll)
-            pitch_values.append(attitude.pitch)
-            yaw_values.append(attitude.yaw)
-
-        roll = numpy.interp(target_timestamp, timestamps, roll_values)
-        pitch = numpy.interp(target_timestamp, timestamps, pitch_values)
-        yaw = numpy.interp(target_timestamp, timestamps, yaw_values)
+        roll, pitch, yaw = values[:3]
 
         current_attitude = Attitude(
             timestamp=target_timestamp,
@@ -172,11 +243,105 @@ class AttitudeProcessor(DataProcessor):
 
 class GimbalProcessor(DataProcessor):
     def __init__(self):
-        super().__init__(QueuePipe(), MAVLinkDataType.GIMBAL)
+        super().__init__(
+            MAVLinkDataType.GIMBAL,
+            TimeSeriesBuffer(("flags", "w", "x", "y", "z"))
+        )
 
     def add_data(self, data):
         format_data = Gimbal.from_mavlink(data)
-        self.queue.add_data(format_data)
+        self.latest = format_data
+        self.series.append(
+            format_data.timestamp,
+            format_data.flags,
+            *format_data.quaternion.to_array()
+        )
+
+    def get_data(self):
+        return self.latest
+
+    def get_data_at(self, timestamp, max_extrapolation=0.1):
+        location = self.series.locate(timestamp, max_extrapolation)
+
+        if location is None:
+            return None
+
+        previous_values, next_values, weight = location
+        quaternion = slerp(previous_values[1:], next_values[1:], weight)
+        flags = previous_values[0] if weight < 0.5 else next_values[0]
+
+        return Gimbal(
+            timestamp=timestamp,
+            flags=int(flags),
+            quaternion=Quaternion(list(quaternion))
+        )
+
+
+class ChannelsProcessor(DataProcessor, ABC):
+    def __init__(self, data_type: MAVLinkDataType, attributes, channel_map: ChannelMap = None, max_size=100):
+        super().__init__(data_type, TimeSeriesBuffer(attributes, max_size=max_size))
+        self.getter = operator.attrgetter(*attributes)
+        self.channel_map = channel_map
+
+        self.timestamp = None
+        self.raw = numpy.zeros(len(attributes))
+        self.axes = numpy.zeros(0)
+        self.switches = numpy.zeros(0, dtype=numpy.intp)
+
+    def add_data(self, data):
+        timestamp = packet_timestamp(data)
+        values = self.getter(data)
+
+        self.series.append(timestamp, *values)
+
+        raw = numpy.array(values, dtype=numpy.float64)
+        if self.channel_map is not None:
+            self.axes = self.channel_map.clamp_axes(raw)
+            self.switches = self.channel_map.quantise_switches(raw)
+
+        self.raw = raw
+        self.timestamp = timestamp
+
+    def get_switch_positions(self):
+        if self.channel_map is None:
+            return []
+
+        return self.channel_map.switch_positions(self.switches)
+
+
+class RCChannelsProcessor(ChannelsProcessor):
+    CHANNELS = 18
+
+    def __init__(self, channel_map: ChannelMap = None, max_size=100):
+        attributes = [f"chan{index}_raw" for index in range(1, self.CHANNELS + 1)] + ["chancount", "rssi"]
+        super().__init__(MAVLinkDataType.RC, attributes, channel_map, max_size)
+
+    def get_data(self):
+        if self.timestamp is None:
+            return None
+
+        raw = self.raw
+
+        return RCChannels(
+            timestamp=self.timestamp,
+            channels_count=int(raw[self.CHANNELS]),
+            channels_raw=raw[:self.CHANNELS].astype(int).tolist(),
+            rssi=int(raw[self.CHANNELS + 1])
+        )
+
+
+class ServoChannelsProcessor(ChannelsProcessor):
+    CHANNELS = 16
+
+    def __init__(self, channel_map: ChannelMap = None, max_size=100):
+        attributes = [f"servo{index}_raw" for index in range(1, self.CHANNELS + 1)]
+        super().__init__(MAVLinkDataType.SERVO, attributes, channel_map, max_size)
 
     def get_data(self):
-        return self.queue.get_latest()
+        if self.timestamp is None:
+            return None
+
+        return ServoChannels(
+            timestamp=self.timestamp,
+            servos_raw=self.raw.astype(int).tolist()
+        )
@@ -0,0 +1,111 @@
+import struct
+import threading
+import time
+
+from pymavlink import mavutil
+
+
+class TelemetryRecorder:
+    def __init__(self, path, buffer_size=1 << 16):
+        self.path = path
+        self.file = open(path, "ab", buffering=buffer_size)
+        self.lock = threading.Lock()
+        self.count = 0
+
+    def write(self, message, timestamp=None):
+        if timestamp is None:
+            timestamp = getattr(message, "_timestamp", None) or time.time()
+
+        buffer = message.get_msgbuf()
+        if not buffer:
+            return
+
+        with self.lock:
+            self.file.write(struct.pack(">Q", int(timestamp * 1e6)))
+            self.file.write(buffer)
+            self.count += 1
+
+    def flush(self):
+        with self.lock:
+            self.file.flush()
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class TelemetryReplay:
+    def __init__(self, path, speed=1.0, loop=False, idle_timeout=0.1):
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+        self.idle_timeout = idle_timeout
+
+        self.connection = None
+        self.finished = False
+        self.count = 0
+
+        self.log_start = None
+        self.wall_start = None
+
+        self.open()
+
+    def open(self):
+        if self.connection is not None:
+            self.connection.close()
+
+        self.connection = mavutil.mavlink_connection(self.path, notimestamps=False)
+        self.log_start = None
+        self.wall_start = None
+
+    def wait(self, message):
+        if not self.speed:
+            return
+
+        timestamp = getattr(message, "_timestamp", None)
+        if timestamp is None:
+            return
+
+        if self.log_start is None:
+            self.log_start = timestamp
+            self.wall_start = time.monotonic()
+            return
+
+        delay = self.wall_start + (timestamp - self.log_start) / self.speed - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def receive_data(self):
+        if self.finished:
+            time.sleep(self.idle_timeout)
+            return None
+
+        message = self.connection.recv_match()
+
+        if message is None:
+            if self.loop:
+                self.open()
+                return None
+
+            self.finished = True
+            return None
+
+        self.wait(message)
+        self.count += 1
+
+        return message
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,200 @@
+import select
+import socket
+import threading
+import time
+
+
+class UDPEndpoint:
+    def __init__(self, host, port):
+        self.address = (socket.gethostbyname(host), int(port))
+
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setblocking(False)
+        self.socket.bind(("0.0.0.0", 0))
+
+    def send(self, buffer):
+        try:
+            self.socket.sendto(buffer, self.address)
+        except OSError:
+            pass
+
+    def receive(self):
+        try:
+            return self.socket.recv(65535)
+        except OSError:
+            return None
+
+    def fileno(self):
+        return self.socket.fileno()
+
+    def close(self):
+        self.socket.close()
+
+
+class TCPEndpoint:
+    def __init__(self, host, port, min_retry_delay=0.5, max_retry_delay=30.0, max_pending=1 << 20):
+        self.address = (host, int(port))
+        self.socket = None
+        self.lock = threading.Lock()
+
+        self.min_retry_delay = min_retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.retry_delay = min_retry_delay
+        self.retry_at = 0.0
+
+        self.pending = bytearray()
+        self.max_pending = max_pending
+
+        self.connect()
+
+    def connect(self):
+        now = time.monotonic()
+        if now < self.retry_at:
+            return
+
+        try:
+            connection = socket.create_connection(self.address, timeout=1.0)
+            connection.setblocking(False)
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError as error:
+            print(f"Failed to connect to {self.address[0]}:{self.address[1]}: {error}, retrying in {self.retry_delay:.1f}s")
+            self.retry_at = now + self.retry_delay
+            self.retry_delay = min(self.retry_delay * 2, self.max_retry_delay)
+            return
+
+        with self.lock:
+            self.socket = connection
+            self.pending.clear()
+        self.retry_delay = self.min_retry_delay
+
+    def send(self, buffer):
+        with self.lock:
+            if self.socket is None:
+                return
+
+            if self.pending:
+                if len(self.pending) + len(buffer) <= self.max_pending:
+                    self.pending += buffer
+                return
+
+            try:
+                sent = self.socket.send(buffer)
+            except BlockingIOError:
+                sent = 0
+            except OSError:
+                self._close()
+                return
+
+            if sent < len(buffer):
+                self.pending += memoryview(buffer)[sent:]
+
+    def has_pending(self):
+        with self.lock:
+            return self.socket is not None and bool(self.pending)
+
+    def flush(self):
+        with self.lock:
+            if self.socket is None or not self.pending:
+                return
+
+            try:
+                sent = self.socket.send(self.pending)
+            except BlockingIOError:
+                return
+            except OSError:
+                self._close()
+                return
+
+            del self.pending[:sent]
+
+    def receive(self):
+        connection = self.socket
+        if connection is None:
+            return None
+
+        try:
+            data = connection.recv(65535)
+        except BlockingIOError:
+            return None
+        except OSError:
+            data = b""
+
+        if not data:
+            self.close()
+            return None
+
+        return data
+
+    def fileno(self):
+        connection = self.socket
+        return connection.fileno() if connection is not None else -1
+
+    def _close(self):
+        if self.socket is not None:
+            self.socket.close()
+            self.socket = None
+        self.pending.clear()
+
+    def close(self):
+        with self.lock:
+            self._close()
+
+
+def create_endpoint(url):
+    protocol, host, port = url.split(":")
+
+    if protocol == "udp":
+        return UDPEndpoint(host, port)
+    elif protocol == "tcp":
+        return TCPEndpoint(host, port)
+    else:
+        raise ValueError(f"Unsupported endpoint protocol: {protocol}")
+
+
+class MAVLinkRouter(threading.Thread):
+    def __init__(self, mavlink_controller, endpoints, poll_interval=0.1):
+        super().__init__(daemon=True)
+        self.mavlink_controller = mavlink_controller
+        self.endpoints = [create_endpoint(url) for url in endpoints]
+        self.poll_interval = poll_interval
+        self.running = False
+
+    def forward(self, connection, message):
+        buffer = message.get_msgbuf()
+        if not buffer or message.get_type() == "BAD_DATA":
+            return
+
+        for endpoint in self.endpoints:
+            endpoint.send(buffer)
+
+    def run(self):
+        self.running = True
+        while self.running:
+            readable = [endpoint for endpoint in self.endpoints if endpoint.fileno() >= 0]
+            if not readable:
+                select.select([], [], [], self.poll_interval)
+                self.reconnect()
+                continue
+
+            writable = [endpoint for endpoint in readable if isinstance(endpoint, TCPEndpoint) and endpoint.has_pending()]
+            ready, ready_to_write, _ = select.select(readable, writable, [], self.poll_interval)
+            for endpoint in ready_to_write:
+                endpoint.flush()
+
+            for endpoint in ready:
+                buffer = endpoint.receive()
+                if buffer:
+                    self.mavlink_controller.send_raw(buffer)
+
+            self.reconnect()
+
+    def reconnect(self):
+        for endpoint in self.endpoints:
+            if isinstance(endpoint, TCPEndpoint) and endpoint.socket is None:
+                endpoint.connect()
+
+    def stop(self):
+        self.running = False
+
+        for endpoint in self.endpoints:
+            endpoint.close()
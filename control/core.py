@@ -1,21 +1,53 @@
+import hashlib
 import math
+import os
 import threading
+import time
 import random
 
 import cv2
 
-from .communication.communicator import DroneDataService
-from .analysis.analysist import DroneAnalysisService
+from .analysis.config import DetectorConfig
 from datetime import datetime
 
 
 class DroneCoreService:
-    def __init__(self, mavlink_address, stream_host, stream_port, model_path, dem_path):
-        self.data_service = DroneDataService(mavlink_address, stream_host, stream_port)
-        self.analysis_service = DroneAnalysisService(
-            model_path,
-            dem_path
-        )
+    def __init__(self, mavlink_address, stream_host, stream_port, model_path, dem_path, frame_ring=None, analysis_scale=1,
+                 detector_backend="torch", detector_input_size=640, detection_tiling=False,
+                 detection_focus=False, detector_precision="fp32", reid_quantized_path=None,
+                 detection_gating=False, models_directory=None):
+        self.data_service_options = {
+            "mavlink_connection_str": mavlink_address,
+            "host": stream_host,
+            "port": stream_port,
+            "frame_ring": frame_ring,
+            "frame_scale": analysis_scale
+        }
+        self.analysis_service_options = {
+            "model_path": model_path,
+            "dem_path": dem_path,
+            "backend": detector_backend,
+            "input_size": detector_input_size,
+            "tiling": detection_tiling,
+            "focus": detection_focus,
+            "precision": detector_precision,
+            "reid_quantized_path": reid_quantized_path,
+            "scene_gating": detection_gating
+        }
+
+        self.models_directory = os.path.realpath(models_directory or os.path.dirname(model_path))
+
+        self.data_service = None
+        self.analysis_service = None
+        self.pending_settings = None
+
+        self.status = {
+            "link": "idle",
+            "models": "idle"
+        }
+        self.startup_lock = threading.Lock()
+        self.settings_lock = threading.Lock()
+        self.started = False
 
         self.colors = [(
             random.randint(0, 255),
@@ -26,9 +58,115 @@ class DroneCoreService:
         self.latest = None
         self.running = False
 
-        self.analysis_thread = threading.Thread(target=self.run_analysis)
-        self.analysis_thread.start()
-        self.start_analysis()
+        self.last_frame_timestamp = None
+        self.last_frame_hash = None
+
+        self.command_handles = {}
+        self.command_lock = threading.Lock()
+        self.model_swap = None
+
+        self.analysis_thread = threading.Thread(target=self.run_analysis, daemon=True)
+
+    def start(self):
+        with self.startup_lock:
+            if self.started:
+                return
+            self.started = True
+
+        threading.Thread(target=self.connect, daemon=True).start()
+        threading.Thread(target=self.load_models, daemon=True).start()
+
+    def connect(self):
+        self.status["link"] = "connecting"
+
+        try:
+            from .communication.communicator import DroneDataService
+
+            self.data_service = DroneDataService(**self.data_service_options)
+        except Exception as e:
+            print(f"Failed to connect to the vehicle: {e}")
+            self.status["link"] = "failed"
+            return
+
+        self.status["link"] = "ready"
+        self.start_when_ready()
+
+    def load_models(self):
+        self.status["models"] = "loading"
+
+        try:
+            from .analysis.analysist import DroneAnalysisService
+
+            analysis_service = DroneAnalysisService(**self.analysis_service_options)
+
+            self.status["models"] = "warming_up"
+            analysis_service.warm_up()
+        except Exception as e:
+            print(f"Failed to load analysis models: {e}")
+            self.status["models"] = "failed"
+            return
+
+        with self.settings_lock:
+            pending_settings, self.pending_settings = self.pending_settings, None
+            if pending_settings is not None:
+                try:
+                    self.apply_settings(analysis_service, *pending_settings)
+                except ValueError as e:
+                    print(f"Ignoring invalid detector settings: {e}")
+
+            self.analysis_service = analysis_service
+
+        self.status["models"] = "ready"
+        self.start_when_ready()
+
+    def start_when_ready(self):
+        with self.startup_lock:
+            if self.is_ready() and not self.analysis_thread.is_alive():
+                self.analysis_thread.start()
+
+    def is_ready(self):
+        return self.data_service is not None and self.analysis_service is not None
+
+    def readiness(self):
+        return {
+            "ready": self.is_ready(),
+            **self.status,
+            "model_swap": self.model_swap_status()
+        }
+
+    def resolve_model_path(self, name):
+        if not name:
+            return None
+
+        path = os.path.realpath(os.path.join(self.models_directory, name))
+        if os.path.commonpath([path, self.models_directory]) != self.models_directory or not os.path.isfile(path):
+            raise ValueError(f"Model {name} is not available in {self.models_directory}")
+
+        return path
+
+    def swap_models(self, **options):
+        for option in ("model_path", "reid_weights_path", "reid_quantized_path"):
+            options[option] = self.resolve_model_path(options.get(option))
+
+        if self.analysis_service is None:
+            print("Analysis models are not loaded yet, swap ignored")
+            return None
+
+        self.model_swap = self.analysis_service.load_models(**options)
+
+        return self.model_swap
+
+    def model_swap_status(self):
+        if self.model_swap is None:
+            return None
+        if not self.model_swap.done():
+            return "loading"
+        if self.model_swap.cancelled():
+            return "superseded"
+        if self.model_swap.exception() is not None:
+            return "failed"
+
+        return "swapped"
 
     def start_analysis(self):
         self.running = True
@@ -37,6 +175,9 @@ class DroneCoreService:
         self.running = False
 
     def execute_command(self, command_dictionary):
+        if self.data_service is None:
+            raise ConnectionError("Vehicle link is not ready")
+
         command = command_dictionary["COMMAND"]
         arguments = command_dictionary["ARGUMENTS"]
         if command == "ARM":
@@ -52,21 +193,21 @@ class DroneCoreService:
             pass
 
         elif command == "POINT_CAMERA":
-            self.data_service.mavlink_connection.gimbal.set_angles(
+            return self.data_service.mavlink_connection.gimbal.set_angles(
                 float(arguments["ROLL"]),
                 float(arguments["PITCH"]),
                 float(arguments["YAW"])
             )
 
         elif command == "SET_ROI":
-            self.data_service.mavlink_connection.gimbal.set_roi_location(
+            return self.data_service.mavlink_connection.gimbal.set_roi_location(
                 float(arguments["LATITUDE"]),
                 float(arguments["LONGITUDE"]),
                 float(arguments["ALTITUDE"])
             )
 
         elif command == "DISABLE_ROI":
-            self.data_service.mavlink_connection.gimbal.disable_roi()
+            return self.data_service.mavlink_connection.gimbal.disable_roi()
 
         elif command == "GO_TO":
             pass
@@ -77,25 +218,92 @@ class DroneCoreService:
         elif command == "POINT_DRONE":
             pass
 
-    def update_settings(self, detection_threshold, iou_threshold, max_detections, classes_excluded):
-        self.analysis_service.detection_threshold = detection_threshold
-        self.analysis_service.iou_threshold = iou_threshold
-        self.analysis_service.max_detections = max_detections
-        self.analysis_service.classes = [key for key in self.analysis_service.model.names.keys() if key not in classes_excluded]
+        return None
+
+    def track_command(self, key, handle):
+        with self.command_lock:
+            self.command_handles[key] = handle
+
+    def command_status(self, key):
+        with self.command_lock:
+            handle = self.command_handles.get(key)
+
+            if handle is None:
+                return None
+            if not handle.done():
+                return "running"
+
+            self.command_handles.pop(key, None)
+
+        if handle.cancelled():
+            return "cancelled"
+        if handle.exception() is not None:
+            return "failed"
+        from pymavlink import mavutil
+
+        if handle.result() == mavutil.mavlink.MAV_RESULT_ACCEPTED:
+            return "accepted"
+
+        return "rejected"
+
+    def update_settings(self, detection_threshold, iou_threshold, max_detections, classes_excluded, class_thresholds=None):
+        with self.settings_lock:
+            if self.analysis_service is None:
+                DetectorConfig(detection_threshold, iou_threshold, max_detections, class_thresholds=class_thresholds or ())
+                self.pending_settings = (detection_threshold, iou_threshold, max_detections, classes_excluded, class_thresholds)
+                return
+
+            self.apply_settings(
+                self.analysis_service,
+                detection_threshold,
+                iou_threshold,
+                max_detections,
+                classes_excluded,
+                class_thresholds
+            )
+
+    @staticmethod
+    def apply_settings(analysis_service, detection_threshold, iou_threshold, max_detections, classes_excluded, class_thresholds=None):
+        config = DetectorConfig.create(
+            analysis_service.model.names,
+            detection_threshold,
+            iou_threshold,
+            max_detections,
+            classes_excluded,
+            class_thresholds
+        )
+        analysis_service.update_config(config)
 
     def get_drone_data(self):
         drone_data = self.data_service.get_drone_data()
 
+        camera_timestamp = drone_data.camera.timestamp
         camera_frame = drone_data.camera.frame
         image_width = drone_data.camera.width
         image_height = drone_data.camera.height
         fov_horizontal = drone_data.camera.fov
         fov_vertical = 2 * math.atan(math.tan(fov_horizontal / 2) * (image_height / image_width))
+        frame_sequence = drone_data.camera.sequence
+
+        return camera_timestamp, camera_frame, image_width, image_height, fov_horizontal, fov_vertical, frame_sequence
+
+    def camera_time(self, camera_timestamp, max_clock_skew=1.0):
+        if not camera_timestamp:
+            return None
 
-        return camera_frame, image_width, image_height, fov_horizontal, fov_vertical
+        timestamp = float(camera_timestamp)
+        for resolution in (1e9, 1e6, 1e3):
+            if timestamp > 1e8 * resolution:
+                timestamp /= resolution
+                break
 
-    def get_mavlink_data(self):
-        mavlink_data = self.data_service.get_mavlink_data()
+        if abs(time.time() - timestamp) > max_clock_skew:
+            return None
+
+        return timestamp
+
+    def get_mavlink_data(self, timestamp=None):
+        mavlink_data = self.data_service.get_mavlink_data(timestamp)
 
         gimbal = mavlink_data["gimbal"]
         attitude = mavlink_data["attitude"]
@@ -103,6 +311,49 @@ class DroneCoreService:
 
         return gimbal, attitude, global_position
 
+    def is_duplicate_frame(self, camera_timestamp, camera_frame):
+        frame_hash = hashlib.blake2b(camera_frame, digest_size=16).digest()
+
+        duplicate = self.latest is not None and (
+            (camera_timestamp and camera_timestamp == self.last_frame_timestamp) or
+            frame_hash == self.last_frame_hash
+        )
+
+        self.last_frame_timestamp = camera_timestamp
+        self.last_frame_hash = frame_hash
+
+        return duplicate
+
+    def compose_telemetry(self, gimbal_data, attitude_data, global_position_data):
+        gimbal_roll, gimbal_pitch, gimbal_yaw = gimbal_data.quaternion.to_euler()
+
+        return {
+            "location": {
+                "latitude": global_position_data.latitude,
+                "longitude": global_position_data.longitude,
+                "altitude": global_position_data.altitude
+            },
+            "attitude": {
+                "roll": attitude_data.roll,
+                "pitch": attitude_data.pitch,
+                "yaw": attitude_data.yaw
+            },
+            "gimbal": {
+                "roll": gimbal_roll,
+                "pitch": gimbal_pitch,
+                "yaw": gimbal_yaw
+            }
+        }
+
+    def refresh_telemetry(self, gimbal_data, attitude_data, global_position_data):
+        latest = dict(self.latest)
+        latest["drone"] = {
+            **latest["drone"],
+            **self.compose_telemetry(gimbal_data, attitude_data, global_position_data)
+        }
+
+        self.latest = latest
+
     def paint_info(self, image, frame, track_id):
         color = self.colors[track_id % len(self.colors)]
 
@@ -141,34 +392,25 @@ class DroneCoreService:
     def run_analysis(self):
         self.running = True
         while self.running:
-            camera_frame, image_width, image_height, fov_horizontal, fov_vertical = self.get_drone_data()
-            gimbal_data, attitude_data, global_position_data = self.get_mavlink_data()
+            camera_timestamp, camera_frame, _, _, fov_horizontal, fov_vertical, frame_sequence = self.get_drone_data()
+            gimbal_data, attitude_data, global_position_data = self.get_mavlink_data(self.camera_time(camera_timestamp))
+
+            if self.is_duplicate_frame(camera_timestamp, camera_frame):
+                self.refresh_telemetry(gimbal_data, attitude_data, global_position_data)
+                continue
+
+            frame_height, frame_width = camera_frame.shape[:2]
 
-            gimbal_roll, gimbal_pitch, gimbal_yaw = gimbal_data.quaternion.to_euler()
             analysis_result = {
                 "timestamp": datetime.now(),
                 "drone": {
-                    "location": {
-                        "latitude": global_position_data.latitude,
-                        "longitude": global_position_data.longitude,
-                        "altitude": global_position_data.altitude
-                    },
-                    "attitude": {
-                        "roll": attitude_data.roll,
-                        "pitch": attitude_data.pitch,
-                        "yaw": attitude_data.yaw
-                    },
+                    **self.compose_telemetry(gimbal_data, attitude_data, global_position_data),
                     "camera": {
                         "frame": camera_frame,
-                        "width": image_width,
-                        "height": image_height,
+                        "width": frame_width,
+                        "height": frame_height,
                         "fov_horizontal": fov_horizontal,
                         "fov_vertical": fov_vertical
-                    },
-                    "gimbal": {
-                        "roll": gimbal_roll,
-                        "pitch": gimbal_pitch,
-                        "yaw": gimbal_yaw
                     }
                 },
                 "analysis": {
@@ -177,13 +419,28 @@ class DroneCoreService:
                 }
             }
 
-            detections = self.analysis_service.predict(camera_frame)
+            self.analysis_service.apply_pending_models()
+
+            detections = self.analysis_service.detect(
+                camera_frame,
+                global_position_data.relative_altitude if global_position_data is not None else None,
+                fov_horizontal,
+                attitude_data,
+                global_position_data
+            )
 
             tracks = self.analysis_service.update_tracker(camera_frame, detections)
 
+            if frame_sequence is not None:
+                camera_frame = camera_frame.copy()
+                if not self.data_service.frame_is_valid(frame_sequence):
+                    print(f"Frame {frame_sequence} was overwritten in the frame ring during analysis, result dropped")
+                    continue
+                analysis_result["drone"]["camera"]["frame"] = camera_frame
+
             tracks_locations = self.analysis_service.geospatial_analysis(
                 tracks,
-                image_width, image_height,
+                frame_width, frame_height,
                 fov_horizontal, fov_vertical,
                 gimbal_data, attitude_data, global_position_data
             )
@@ -34,7 +34,8 @@ def start_flight(user_id):
         {'parameter': 'confidence', 'value': '0.5'},
         {'parameter': 'jaccard_index', 'value': '0.5'},
         {'parameter': 'detection_limit', 'value': '100'},
-        {'parameter': 'exclude_classes', 'value': '-1'}
+        {'parameter': 'exclude_classes', 'value': '-1'},
+        {'parameter': 'class_confidence', 'value': ''}
     ]
 
     for setting in default_settings:
@@ -120,7 +121,7 @@ def get_analysis(user_id):
             "image": image,
             "tracks": [{
                 "track_id": str(track["track_id"]),
-                "class_name": str(core_service.analysis_service.model.names[track["class_id"]]),
+                "class_name": str(core_service.analysis_service.model.names.get(track["class_id"], track["class_id"])),
                 "latitude": str(track["location"]["latitude"]),
                 "longitude": str(track["location"]["longitude"]),
                 "altitude": str(track["location"]["altitude"])
@@ -11,6 +11,20 @@ from utils.helpers import flight_active_required
 navigation_bp = Blueprint('navigation_bp', __name__)
 
 
+def refresh_task_statuses(tasks):
+    for task in tasks:
+        if task.status != 1:
+            continue
+
+        command_status = core_service.command_status(task.id)
+        if command_status == "accepted":
+            task.status = 2
+        elif command_status in (None, "cancelled", "failed", "rejected"):
+            task.status = 0
+
+    db.session.commit()
+
+
 @navigation_bp.route('/')
 @token_required
 @flight_active_required
@@ -18,6 +32,7 @@ def navigation(user_id):
     flight_id = session.get('flight_id')
 
     tasks = Task.query.filter_by(flight_id=flight_id).all()
+    refresh_task_statuses(tasks)
 
     return render_template('navigation.html', tasks=tasks)
 
@@ -29,6 +44,8 @@ def get_tasks(user_id):
     flight_id = session.get('flight_id')
 
     tasks = Task.query.filter_by(flight_id=flight_id).all()
+    refresh_task_statuses(tasks)
+
     tasks_data = [{'id': task.id, 'command': task.command, 'status': task.status} for task in tasks]
     return jsonify({'tasks': tasks_data})
 
@@ -94,7 +111,6 @@ def run_task(user_id, task_id):
     task = Task.query.get(task_id)
     if task:
         task.status = 1
-        db.session.commit()
 
         command_string = task.command
         command_dictionary = eval(command_string)
@@ -119,9 +135,17 @@ def run_task(user_id, task_id):
             elif command_dictionary["POINT_DRONE_OBJECT"]:
                 command_dictionary["COMMAND"] = "POINT_DRONE"
 
-        core_service.execute_command(command_dictionary)
+        try:
+            command_handle = core_service.execute_command(command_dictionary)
+        except ConnectionError as e:
+            print(f"Task {task.id} was not sent: {e}")
+            task.status = 0
+        else:
+            if command_handle is None:
+                task.status = 2
+            else:
+                core_service.track_command(task.id, command_handle)
 
-        task.status = 2
         db.session.commit()
 
     return redirect(url_for('navigation_bp.navigation'))
@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, request, session, redirect, url_for
+from flask import Blueprint, render_template, request, session, redirect, url_for, jsonify
 
 from db import db
 from models import Setting
@@ -33,9 +33,36 @@ def update(user_id):
         {'parameter': 'confidence', 'value': request.form['confidence']},
         {'parameter': 'exclude_classes', 'value': request.form['exclude_classes']},
         {'parameter': 'detection_limit', 'value': request.form['detection_limit']},
-        {'parameter': 'jaccard_index', 'value': request.form['jaccard_index']}
+        {'parameter': 'jaccard_index', 'value': request.form['jaccard_index']},
+        {'parameter': 'class_confidence', 'value': request.form.get('class_confidence', '')}
     ]
 
+    settings_dict = {setting['parameter']: setting['value'] for setting in settings}
+
+    try:
+        detection_threshold = float(settings_dict.get('confidence', 0.5))
+        iou_threshold = float(settings_dict.get('jaccard_index', 0.5))
+        max_detections = int(settings_dict.get('detection_limit', 100))
+        classes_excluded = [
+            int(class_id) for class_id in settings_dict.get('exclude_classes', '-1').split(',') if class_id.strip()
+        ]
+        class_thresholds = {
+            int(class_id): float(threshold)
+            for class_id, threshold in (
+                item.split(':') for item in settings_dict.get('class_confidence', '').split(',') if item.strip()
+            )
+        }
+
+        core_service.update_settings(
+            detection_threshold=detection_threshold,
+            iou_threshold=iou_threshold,
+            max_detections=max_detections,
+            classes_excluded=classes_excluded,
+            class_thresholds=class_thresholds
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
     for setting in settings:
         setting_obj = Setting.query.filter_by(flight_id=flight_id, parameter=setting['parameter']).first()
         if setting_obj:
@@ -46,18 +73,29 @@ def update(user_id):
 
     db.session.commit()
 
-    settings_dict = {setting['parameter']: setting['value'] for setting in settings}
+    return redirect(url_for('dashboard.dashboard'))
 
-    detection_threshold = float(settings_dict.get('confidence', 0.5))
-    iou_threshold = float(settings_dict.get('jaccard_index', 0.5))
-    max_detections = int(settings_dict.get('detection_limit', 100))
-    classes_excluded = list(map(int, settings_dict.get('exclude_classes', '-1').split(',')))
 
-    core_service.update_settings(
-        detection_threshold=detection_threshold,
-        iou_threshold=iou_threshold,
-        max_detections=max_detections,
-        classes_excluded=classes_excluded
-    )
+@settings_bp.route('/models', methods=['POST'])
+@token_required
+@flight_active_required
+def swap_models(user_id):
+    try:
+        options = {
+            "model_path": request.form.get('model_path') or None,
+            "backend": request.form.get('backend', 'torch'),
+            "input_size": int(request.form.get('input_size', 640)),
+            "precision": request.form.get('precision', 'fp32'),
+            "reid_base": request.form.get('reid_base') or None,
+            "reid_weights_path": request.form.get('reid_weights_path') or None,
+            "reid_quantized_path": request.form.get('reid_quantized_path') or None
+        }
 
-    return redirect(url_for('dashboard.dashboard'))
+        model_swap = core_service.swap_models(**options)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if model_swap is None:
+        return jsonify({'error': 'Analysis models are not loaded yet'}), 503
+
+    return jsonify({'status': core_service.model_swap_status()}), 202
@@ -0,0 +1,105 @@
+import time
+from concurrent.futures import CancelledError
+from types import SimpleNamespace
+
+import pytest
+from pymavlink import mavutil
+from pymavlink.dialects.v20 import common
+
+from control.communication.mavlink.mavlink import CommandScheduler
+
+
+class FakeController:
+    def __init__(self):
+        self.command_scheduler = None
+        self.sent = []
+
+    def send_packet(self, message):
+        self.sent.append((message.command, message.confirmation, message.param1))
+
+
+def command(command_id, param1=0.0):
+    return common.MAVLink_command_long_message(1, 1, command_id, 0, param1, 0, 0, 0, 0, 0, 0)
+
+
+def acknowledge(command_id, result=mavutil.mavlink.MAV_RESULT_ACCEPTED):
+    return SimpleNamespace(command=command_id, result=result)
+
+
+def wait_for(condition, timeout=1.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+@pytest.fixture
+def controller():
+    return FakeController()
+
+
+def scheduler_for(controller, **kwargs):
+    options = {"send_interval": 0.01, "timeout": 0.05, "retries": 3, **kwargs}
+
+    return CommandScheduler(controller, **options)
+
+
+def test_scheduler_registers_with_controller(controller):
+    scheduler = scheduler_for(controller)
+
+    assert controller.command_scheduler is scheduler
+
+
+def test_pending_commands_are_coalesced(controller):
+    scheduler = scheduler_for(controller, timeout=5.0)
+
+    first = scheduler.submit(command(mavutil.mavlink.MAV_CMD_DO_SET_ROI_LOCATION, 1.0))
+    second = scheduler.submit(command(mavutil.mavlink.MAV_CMD_DO_SET_ROI_LOCATION, 2.0))
+
+    assert first.cancelled()
+    with pytest.raises(CancelledError):
+        first.result()
+
+    scheduler.start()
+    try:
+        scheduler.add_data(acknowledge(mavutil.mavlink.MAV_CMD_DO_SET_ROI_LOCATION, mavutil.mavlink.MAV_RESULT_IN_PROGRESS))
+        assert not second.done()
+
+        wait_for(lambda: controller.sent)
+        scheduler.add_data(acknowledge(mavutil.mavlink.MAV_CMD_DO_SET_ROI_LOCATION))
+
+        assert second.result(timeout=1.0) == mavutil.mavlink.MAV_RESULT_ACCEPTED
+    finally:
+        scheduler.stop()
+
+    assert controller.sent == [(mavutil.mavlink.MAV_CMD_DO_SET_ROI_LOCATION, 0, 2.0)]
+
+
+def test_retries_increment_confirmation_until_timeout(controller):
+    scheduler = scheduler_for(controller)
+    future = scheduler.submit(command(mavutil.mavlink.MAV_CMD_DO_MOUNT_CONTROL))
+
+    scheduler.start()
+    try:
+        with pytest.raises(TimeoutError):
+            future.result(timeout=2.0)
+    finally:
+        scheduler.stop()
+
+    assert [confirmation for _, confirmation, _ in controller.sent] == [0, 1, 2]
+
+
+def test_acknowledgement_stops_retries(controller):
+    scheduler = scheduler_for(controller, timeout=0.2)
+    future = scheduler.submit(command(mavutil.mavlink.MAV_CMD_DO_MOUNT_CONTROL))
+
+    scheduler.start()
+    try:
+        wait_for(lambda: controller.sent)
+        scheduler.add_data(acknowledge(mavutil.mavlink.MAV_CMD_DO_MOUNT_CONTROL, mavutil.mavlink.MAV_RESULT_DENIED))
+
+        assert future.result(timeout=1.0) == mavutil.mavlink.MAV_RESULT_DENIED
+    finally:
+        scheduler.stop()
+
+    assert len(controller.sent) == 1
@@ -0,0 +1,65 @@
+import numpy
+import pytest
+
+from control.analysis.config import CANDIDATE_LIMIT, DetectorConfig
+
+
+NAMES = {0: "pedestrian", 1: "car", 2: "truck"}
+
+
+def boxes(*rows):
+    return numpy.array([[0, 0, 10, 10, score, class_id] for score, class_id in rows], dtype=numpy.float32)
+
+
+def test_filter_without_class_thresholds_returns_boxes_unchanged():
+    config = DetectorConfig(detection_threshold=0.5, max_detections=1)
+    detections = boxes((0.9, 0), (0.6, 1))
+
+    assert config.filter(detections) is detections
+    assert config.detection_arguments()["max_det"] == 1
+
+
+def test_class_thresholds_apply_before_the_detection_cap():
+    config = DetectorConfig(detection_threshold=0.5, max_detections=2, class_thresholds={1: 0.1})
+    detections = boxes((0.45, 0), (0.4, 0), (0.3, 1), (0.2, 1), (0.6, 2))
+
+    filtered = config.filter(detections)
+
+    assert filtered[:, 4].tolist() == pytest.approx([0.6, 0.3])
+    assert filtered[:, 5].tolist() == [2, 1]
+
+
+def test_class_thresholds_widen_the_candidate_limit():
+    config = DetectorConfig(detection_threshold=0.5, max_detections=5, class_thresholds={1: 0.1})
+    arguments = config.detection_arguments()
+
+    assert arguments["max_det"] == CANDIDATE_LIMIT
+    assert arguments["conf"] == pytest.approx(0.1)
+
+
+def test_classes_beyond_the_threshold_table_use_the_default():
+    config = DetectorConfig(detection_threshold=0.5, max_detections=10, class_thresholds={0: 0.2})
+    detections = boxes((0.3, 0), (0.4, 7), (0.7, 7))
+
+    assert config.filter(detections)[:, 5].tolist() == [7, 0]
+
+
+def test_create_excludes_classes_and_rejects_unknown_thresholds():
+    config = DetectorConfig.create(NAMES, 0.25, 0.5, 10, classes_excluded=[2], class_thresholds={1: 0.4})
+
+    assert config.classes == (0, 1)
+    assert config.class_thresholds == ((1, 0.4),)
+
+    with pytest.raises(ValueError):
+        DetectorConfig.create(NAMES, 0.25, 0.5, 10, class_thresholds={5: 0.4})
+
+
+@pytest.mark.parametrize("arguments", [
+    {"detection_threshold": 1.5},
+    {"iou_threshold": 0.0},
+    {"max_detections": 0},
+    {"class_thresholds": {1: 2.0}}
+])
+def test_invalid_settings_are_rejected(arguments):
+    with pytest.raises(ValueError):
+        DetectorConfig(**arguments)
@@ -0,0 +1,73 @@
+import numpy
+import pytest
+
+from control.communication.frame_ring import FrameRing
+
+
+@pytest.fixture
+def ring():
+    with FrameRing(slots=3, max_shape=(8, 8, 3)) as ring:
+        yield ring
+
+
+def frame(value, shape=(8, 8, 3)):
+    return numpy.full(shape, value, dtype=numpy.uint8)
+
+
+def test_write_and_read_view(ring):
+    sequence = ring.write(frame(7), 1.5)
+
+    latest_sequence, timestamp, view = ring.latest()
+    assert latest_sequence == sequence == 0
+    assert timestamp == 1.5
+    assert view.shape == (8, 8, 3)
+    assert (view == 7).all()
+    assert numpy.shares_memory(view, ring.frames)
+
+
+def test_grayscale_and_smaller_frames(ring):
+    sequence = ring.write(frame(3, (4, 6)), 2.0)
+
+    assert ring.get(sequence).shape == (4, 6)
+
+
+def test_frame_larger_than_slot_is_rejected(ring):
+    with pytest.raises(ValueError):
+        ring.write(frame(1, (16, 16, 3)), 0.0)
+
+
+def test_overwritten_slot_is_detected(ring):
+    first = ring.write(frame(1), 0.0)
+    view = ring.get(first)
+
+    for value in range(2, 2 + ring.slots):
+        ring.write(frame(value), float(value))
+
+    assert not ring.is_valid(first)
+    assert ring.get(first) is None
+    assert ring.get_timestamp(first) is None
+    assert (view == 1 + ring.slots).all()
+
+
+def test_torn_read_is_detected(ring):
+    sequence = ring.write(frame(1), 0.0)
+    copy = ring.get(sequence).copy()
+    assert ring.is_valid(sequence)
+
+    ring.headers[sequence % ring.slots]["sequence"] = -1
+    assert not ring.is_valid(sequence)
+    assert ring.get(sequence) is None
+
+    ring.headers[sequence % ring.slots]["sequence"] = sequence
+    assert (copy == ring.get(sequence)).all()
+
+
+def test_reader_attaches_by_name(ring):
+    sequence = ring.write(frame(9), 3.0)
+
+    reader = FrameRing(ring.name, create=False)
+    try:
+        assert reader.slots == ring.slots
+        assert (reader.get(sequence) == 9).all()
+    finally:
+        reader.close()
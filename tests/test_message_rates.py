@@ -0,0 +1,95 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from pymavlink import mavutil
+from pymavlink.dialects.v20 import common
+
+from control.communication import communicator
+from control.communication.mavlink.mavlink import MAVLinkController
+
+
+class FakeController(MAVLinkController):
+    def __init__(self, device):
+        self.send_lock = threading.Lock()
+        self.receive_lock = threading.Lock()
+        self.receive_timeout = 0.01
+        self.command_scheduler = None
+        self.recorder = None
+        self.router = None
+        self.router_endpoints = None
+        self.connection = SimpleNamespace(
+            mav=common.MAVLink(None, srcSystem=255),
+            target_system=1,
+            target_component=1,
+            message_hooks=[]
+        )
+        self.sent = []
+
+    def send_packet(self, message):
+        self.sent.append(message)
+
+    def start_router(self, endpoints):
+        self.router_endpoints = endpoints
+
+    def receive_data(self):
+        time.sleep(self.receive_timeout)
+        return None
+
+
+class FakeReceiver:
+    def __init__(self, host, port, decoder=None, raw=False):
+        self.decoder = decoder
+
+
+@pytest.fixture
+def create_service(monkeypatch):
+    monkeypatch.setattr(communicator, "MAVLinkController", FakeController)
+    monkeypatch.setattr(communicator, "PrefetchStreamReceiver", FakeReceiver)
+    services = []
+
+    def create(**kwargs):
+        service = communicator.DroneDataService("udp:0.0.0.0:14550", "localhost", 5588, **kwargs)
+        services.append(service)
+        return service
+
+    yield create
+
+    for service in services:
+        service.acquisition_thread.stop()
+        service.command_scheduler.stop()
+
+
+def sent_types(service):
+    return [message.get_type() for message in service.mavlink_connection.sent]
+
+
+def requested_intervals(service):
+    return {
+        int(message.param1)
+        for message in service.mavlink_connection.sent
+        if message.get_type() == "COMMAND_LONG" and message.command == common.MAV_CMD_SET_MESSAGE_INTERVAL
+    }
+
+
+CONFIGURED_STREAMS = {
+    getattr(mavutil.mavlink, f"MAVLINK_MSG_ID_{message_type}")
+    for message_type in communicator.MESSAGE_RATES
+    if hasattr(mavutil.mavlink, f"MAVLINK_MSG_ID_{message_type}")
+}
+
+
+def test_streams_are_stopped_without_router(create_service):
+    service = create_service()
+
+    assert sent_types(service)[0] == "REQUEST_DATA_STREAM"
+    assert requested_intervals(service) == CONFIGURED_STREAMS
+
+
+def test_router_keeps_existing_streams(create_service):
+    service = create_service(router_endpoints=["udp:127.0.0.1:14551"])
+
+    assert service.mavlink_connection.router_endpoints == ["udp:127.0.0.1:14551"]
+    assert "REQUEST_DATA_STREAM" not in sent_types(service)
+    assert requested_intervals(service) == CONFIGURED_STREAMS
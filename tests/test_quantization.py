@@ -0,0 +1,71 @@
+import os
+from types import SimpleNamespace
+
+import numpy
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("torchvision")
+pytest.importorskip("ultralytics")
+
+from control.analysis import quantization
+
+
+class TinyBackbone(torch.nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.conv = torch.nn.Conv2d(3, 8, 3, padding=1)
+        self.relu = torch.nn.ReLU()
+        self.avgpool = torch.nn.AdaptiveAvgPool2d(1)
+
+    def forward(self, x):
+        return self.avgpool(self.relu(self.conv(x)))
+
+
+def test_quantize_reid_round_trip(tmp_path):
+    torch.manual_seed(0)
+    configuration = SimpleNamespace(model_base=TinyBackbone().eval(), feature_layer="avgpool")
+    patches = torch.rand(32, 3, 16, 16)
+
+    output_path = quantization.quantize_reid(configuration, patches, str(tmp_path / "reid-int8.pt"))
+    quantized = torch.jit.load(output_path)
+
+    with torch.no_grad():
+        reference = configuration.model_base(patches).flatten(1)
+        features = quantized(patches)["avgpool"].flatten(1)
+
+    similarity = torch.nn.functional.cosine_similarity(reference, features, dim=1)
+    assert features.shape == reference.shape
+    assert similarity.min().item() > 0.95
+
+
+def test_quantize_detector_replaces_existing_artifact(tmp_path, monkeypatch):
+    cached_path = tmp_path / "model-int8_openvino_model"
+    cached_path.mkdir()
+    (cached_path / "stale.xml").write_text("stale")
+
+    class FakeModel:
+        def export(self, **kwargs):
+            exported_path = tmp_path / "export"
+            exported_path.mkdir()
+            (exported_path / "model.xml").write_text("fresh")
+            return str(exported_path)
+
+    class FakeDetector:
+        def __init__(self, model_path, backend, input_size):
+            self.input_size = (input_size, input_size)
+            self.names = {0: "car"}
+            self.model = FakeModel()
+
+        def cached_artifact_path(self, backend, precision):
+            return str(cached_path)
+
+    monkeypatch.setattr(quantization, "DetectorBackend", FakeDetector)
+
+    frames = [numpy.zeros((32, 32, 3), dtype=numpy.uint8)]
+    assert quantization.quantize_detector("model.pt", frames, 32) == str(cached_path)
+    assert sorted(os.listdir(cached_path)) == ["model.xml"]
+
+
+def test_reid_int8_path():
+    assert quantization.reid_int8_path("weights/resnet18.pth") == "weights/resnet18-int8.pt"
@@ -0,0 +1,57 @@
+from types import SimpleNamespace
+
+import numpy
+
+from control.analysis.scene import SceneChangeGate
+
+
+def hovering():
+    attitude = SimpleNamespace(roll_speed=0.0, pitch_speed=0.0, yaw_speed=0.0)
+    global_position = SimpleNamespace(vx=0.0, vy=0.0, vz=0.0)
+
+    return attitude, global_position
+
+
+def frame(value=100):
+    return numpy.full((360, 640, 3), value, dtype=numpy.uint8)
+
+
+def test_static_scene_is_skipped():
+    gate = SceneChangeGate()
+    attitude, global_position = hovering()
+
+    assert not gate.is_static(frame(), attitude, global_position)
+    assert gate.is_static(frame(), attitude, global_position)
+
+
+def test_missing_telemetry_is_treated_as_moving():
+    gate = SceneChangeGate()
+    attitude, global_position = hovering()
+
+    assert gate.is_moving(None, global_position)
+    assert gate.is_moving(attitude, None)
+    assert gate.is_moving(None, None)
+
+    gate.is_static(frame(), attitude, global_position)
+    assert not gate.is_static(frame(), None, global_position)
+    assert not gate.is_static(frame(), attitude, None)
+
+
+def test_motion_and_pixel_change_force_detection():
+    gate = SceneChangeGate()
+    attitude, global_position = hovering()
+    gate.is_static(frame(), attitude, global_position)
+
+    turning = SimpleNamespace(roll_speed=0.0, pitch_speed=0.0, yaw_speed=0.5)
+    assert not gate.is_static(frame(), turning, global_position)
+
+    assert not gate.is_static(frame(200), attitude, global_position)
+
+
+def test_max_skipped_forces_refresh():
+    gate = SceneChangeGate(max_skipped=2)
+    attitude, global_position = hovering()
+
+    results = [gate.is_static(frame(), attitude, global_position) for _ in range(5)]
+
+    assert results == [False, True, True, False, True]
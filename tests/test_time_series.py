@@ -0,0 +1,96 @@
+import math
+
+import numpy
+import pytest
+
+from control.communication.mavlink.mavlink.data import TimeSeriesBuffer, slerp
+
+
+def series(count, max_size=4, **kwargs):
+    buffer = TimeSeriesBuffer(("value", "angle"), max_size=max_size, **kwargs)
+    for index in range(count):
+        buffer.append(float(index), 10.0 * index, 0.0)
+
+    return buffer
+
+
+def test_empty_buffer():
+    buffer = series(0)
+
+    assert buffer.size() == 0
+    assert buffer.last().shape == (3, 0)
+    assert buffer.latest() is None
+    assert buffer.sample(1.0) is None
+    assert buffer.interpolate(1.0) is None
+
+
+def test_wraparound_keeps_newest_samples_in_order():
+    buffer = series(7)
+
+    assert buffer.size() == 4
+    assert buffer.timestamps().tolist() == [3.0, 4.0, 5.0, 6.0]
+    assert buffer.column("value", 2).tolist() == [50.0, 60.0]
+    assert buffer.latest().tolist() == [6.0, 60.0, 0.0]
+    assert buffer.index_of(4.5) == 1
+
+
+def test_last_is_not_overwritten_by_later_appends():
+    buffer = series(4)
+    data = buffer.last()
+
+    buffer.append(4.0, 40.0, 0.0)
+
+    assert data[0].tolist() == [0.0, 1.0, 2.0, 3.0]
+
+
+def test_window():
+    buffer = series(6)
+
+    assert buffer.window(3.0, 4.0)[0].tolist() == [3.0, 4.0]
+
+
+def test_locate_and_sample_interpolate_between_samples():
+    buffer = series(4)
+
+    previous_values, next_values, weight = buffer.locate(1.25)
+    assert previous_values.tolist() == [10.0, 0.0]
+    assert next_values.tolist() == [20.0, 0.0]
+    assert weight == pytest.approx(0.25)
+
+    assert buffer.sample(1.25)[0] == pytest.approx(12.5)
+    assert buffer.interpolate(1.25)[0] == pytest.approx(12.5)
+
+
+def test_sample_extrapolation_is_clamped():
+    buffer = series(4)
+
+    assert buffer.sample(3.05, max_extrapolation=0.1)[0] == pytest.approx(30.5)
+    assert buffer.sample(10.0, max_extrapolation=0.1)[0] == pytest.approx(31.0)
+    assert buffer.sample(-10.0, max_extrapolation=0.1)[0] == pytest.approx(-1.0)
+
+
+def test_periodic_fields_take_the_shortest_arc():
+    buffer = TimeSeriesBuffer(("yaw",), periods={"yaw": 2 * math.pi})
+    buffer.append(0.0, 3.0)
+    buffer.append(1.0, -3.0)
+
+    middle = buffer.sample(0.5)[0]
+    assert abs(middle) == pytest.approx(math.pi)
+
+    after_wrap = buffer.sample(0.75)[0]
+    assert after_wrap == pytest.approx(3.0 + 0.75 * (2 * math.pi - 6.0) - 2 * math.pi)
+    assert -math.pi < after_wrap <= math.pi
+
+    assert buffer.interpolate(0.75)[0] == pytest.approx(after_wrap)
+
+
+def test_slerp():
+    identity = [1.0, 0.0, 0.0, 0.0]
+    half_turn = [0.0, 0.0, 0.0, 1.0]
+
+    middle = slerp(identity, half_turn, 0.5)
+    assert middle == pytest.approx([math.sqrt(0.5), 0.0, 0.0, math.sqrt(0.5)])
+    assert numpy.linalg.norm(middle) == pytest.approx(1.0)
+
+    assert slerp(identity, [-1.0, 0.0, 0.0, 0.0], 0.5) == pytest.approx(identity)
+    assert slerp(identity, half_turn, 0.0) == pytest.approx(identity)